@@ -2,25 +2,64 @@
 Command-line interface for the ebook renamer.
 """
 
-import argparse
 import logging
+import operator
 import os
 import sys
+from dataclasses import replace
 from pathlib import Path
-from typing import Optional
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, List, Optional
 
 from .types import Config, CleanupResult, FileIssue
 from .scanner import Scanner
 from .normalizer import Normalizer
 from .duplicates import DuplicateDetector
 from .todo import TodoList
-from .todo import TodoList
-from .jsonoutput import JSONOutput
-from .tui import run_tui, RICH_AVAILABLE
-
-
-def create_parser() -> argparse.ArgumentParser:
+from .fileops import remove_paths
+
+if TYPE_CHECKING:
+    import argparse
+
+logger = logging.getLogger(__name__)
+
+
+# Flags understood by the fast-path parser; anything else (including
+# -h/--help, abbreviations and combined short flags) falls back to argparse.
+BOOL_FLAGS = {
+    "-d": "dry_run",
+    "--dry-run": "dry_run",
+    "--no-recursive": "no_recursive",
+    "--no-delete": "no_delete",
+    "--preserve-unicode": "preserve_unicode",
+    "--fetch-arxiv": "fetch_arxiv",
+    "-v": "verbose",
+    "--verbose": "verbose",
+    "--delete-small": "delete_small",
+    "--auto-cleanup": "auto_cleanup",
+    "--json": "json",
+}
+VALUE_FLAGS = {
+    "--max-depth": "max_depth",
+    "--extensions": "extensions",
+    "--todo-file": "todo_file",
+    "--log-file": "log_file",
+}
+DEFAULT_EXTENSIONS = frozenset({".pdf", ".epub", ".txt"})
+ARG_DEFAULTS = {
+    "path": ".",
+    "max_depth": "18446744073709551615",
+    "extensions": "",
+    "todo_file": "",
+    "log_file": "",
+}
+
+
+def create_parser() -> "argparse.ArgumentParser":
     """Create the command-line argument parser."""
+    # Imported lazily: argparse is only needed for --help and malformed input
+    import argparse
+
     parser = argparse.ArgumentParser(
         prog="ebook-renamer",
         description="Batch rename and organize downloaded books and arXiv files",
@@ -113,39 +152,80 @@ detects duplicates, and generates a todo.md file for manual review.
     return parser
 
 
+def fast_parse_argv(argv: List[str]) -> Optional[SimpleNamespace]:
+    """Parse well-formed argument lists without building an argparse parser.
+
+    Returns None when argparse should handle the arguments instead, so help
+    output and error messages stay exactly as argparse produces them.
+    """
+    values = dict(ARG_DEFAULTS)
+    values.update({dest: False for dest in BOOL_FLAGS.values()})
+    has_path = False
+
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        i += 1
+        if arg in BOOL_FLAGS:
+            values[BOOL_FLAGS[arg]] = True
+        elif arg.startswith("--") and "=" in arg:
+            flag, value = arg.split("=", 1)
+            if flag not in VALUE_FLAGS:
+                return None
+            values[VALUE_FLAGS[flag]] = value
+        elif arg in VALUE_FLAGS:
+            if i >= len(argv) or argv[i].startswith("-"):
+                return None
+            values[VALUE_FLAGS[arg]] = argv[i]
+            i += 1
+        elif arg.startswith("-") or has_path:
+            return None
+        else:
+            values["path"] = arg
+            has_path = True
+
+    return SimpleNamespace(**values)
+
+
+def _arg_error(message: str) -> None:
+    """Report a usage error the same way argparse does, then exit."""
+    create_parser().error(message)
+
+
 def parse_args() -> Config:
     """Parse command-line arguments and create Config."""
-    parser = create_parser()
-    args = parser.parse_args()
+    args = fast_parse_argv(sys.argv[1:])
+    if args is None:
+        args = create_parser().parse_args()
 
     # Convert to absolute path
     abs_path = os.path.abspath(args.path)
     
     # Check if path exists and is a directory
     if not os.path.exists(abs_path):
-        parser.error(f"Path does not exist: {abs_path}")
+        _arg_error(f"Path does not exist: {abs_path}")
     if not os.path.isdir(abs_path):
-        parser.error(f"Path is not a directory: {abs_path}")
+        _arg_error(f"Path is not a directory: {abs_path}")
 
     # Parse max depth
     try:
         max_depth = int(args.max_depth)
     except ValueError:
-        parser.error(f"Invalid max-depth: {args.max_depth}")
+        _arg_error(f"Invalid max-depth: {args.max_depth}")
 
     # Handle --no-recursive by setting max_depth to 1
     effective_max_depth = max_depth
     if args.no_recursive:
         effective_max_depth = 1
 
-    # Parse extensions
+    # Parse extensions into a set for O(1) membership tests
     if args.extensions:
-        extensions = [ext.strip() for ext in args.extensions.split(",")]
+        extensions = (ext.strip() for ext in args.extensions.split(","))
         # Ensure extensions start with dot
-        extensions = [ext if ext.startswith(".") else f".{ext}" 
-                     for ext in extensions if ext]
+        extensions = frozenset(ext if ext.startswith(".") else f".{ext}"
+                               for ext in extensions if ext)
     else:
-        extensions = [".pdf", ".epub", ".txt"]
+        extensions = DEFAULT_EXTENSIONS
 
     # Handle --fetch-arxiv placeholder
     if args.fetch_arxiv:
@@ -181,10 +261,16 @@ def main() -> int:
     
     try:
         config = parse_args()
-        logging.info(f"Starting ebook renamer with config: {config}")
+        # Extensions are a frozenset; log them sorted so the line doesn't
+        # change with hash randomisation
+        logger.info("Starting ebook renamer with config: %s",
+                    replace(config, extensions=sorted(config.extensions)))
         
-        if not config.json and RICH_AVAILABLE:
-            return run_tui(config)
+        if not config.json:
+            # Imported lazily: rich is slow to import and unused for --json
+            from .tui import run_tui, RICH_AVAILABLE
+            if RICH_AVAILABLE:
+                return run_tui(config)
 
         return process_files(config)
     except KeyboardInterrupt:
@@ -202,12 +288,12 @@ def process_files(config: Config) -> int:
     
     # Scan for files
     files = scanner.scan()
-    logging.info(f"Found {len(files)} files to process")
+    logger.info("Found %d files to process", len(files))
 
     # Normalize filenames
     normalizer = Normalizer()
     normalized = normalizer.normalize_files(files)
-    logging.info(f"Normalized {len(normalized)} files")
+    logger.info("Normalized %d files", len(normalized))
 
     # Determine todo file path
     todo_file_path = determine_todo_file(config.path, config.todo_file)
@@ -219,17 +305,28 @@ def process_files(config: Config) -> int:
     incomplete_downloads = []  # .download, .crdownload files
     corrupted_files = []       # Corrupted PDFs or unreadable files
     small_files = []           # Files that are too small (< 1KB)
+    categorized = set()        # Every file placed in one of the lists above
+    
+    # Read the PDF headers checked below concurrently up front
+    todo_list.prefetch_pdf_headers(
+        file_info.original_path for file_info in normalized
+        if not file_info.is_failed_download and not file_info.is_too_small
+        and file_info.extension_lower == ".pdf"
+    )
     
     for file_info in normalized:
         if file_info.is_failed_download:
             incomplete_downloads.append(file_info)
+            categorized.add(file_info)
         elif file_info.is_too_small:
             small_files.append(file_info)
+            categorized.add(file_info)
         else:
             # Check for corruption
-            if file_info.extension.lower() == ".pdf":
+            if file_info.extension_lower == ".pdf":
                 if not todo_list._validate_pdf_header(file_info.original_path):
                     corrupted_files.append(file_info)
+                    categorized.add(file_info)
 
     # Print summary of found issues
     if not config.json:
@@ -240,7 +337,11 @@ def process_files(config: Config) -> int:
     
     # Track files to delete and todo items
     files_to_delete = []
-    todo_items = []
+    todo_items = []  # (category, file, message) tuples
+    # Todo list removals and additions are queued and applied in one batch
+    # each; in every flag combination all removals come before additions.
+    pending_removals = []
+    pending_issues = []
     cleanup_result = CleanupResult(
         deleted_incomplete=[],
         deleted_corrupted=[],
@@ -253,75 +354,78 @@ def process_files(config: Config) -> int:
         if should_cleanup:
             files_to_delete.append(file_info.original_path)
             cleanup_result.deleted_incomplete.append(file_info.original_path)
-            todo_list.remove_file_from_todo(file_info.original_name)
+            pending_removals.append(file_info.original_name)
         else:
-            todo_list.add_failed_download(file_info)
-            todo_items.append({
-                "category": "failed_download",
-                "file": file_info.original_name,
-                "message": f"重新下载: {file_info.original_name} (未完成下载)"
-            })
+            pending_issues.append((file_info, FileIssue.FAILED_DOWNLOAD))
+            todo_items.append((
+                "failed_download",
+                file_info.original_name,
+                f"重新下载: {file_info.original_name} (未完成下载)",
+            ))
     
     # Process corrupted files
     for file_info in corrupted_files:
         if should_cleanup:
             files_to_delete.append(file_info.original_path)
             cleanup_result.deleted_corrupted.append(file_info.original_path)
-            todo_list.remove_file_from_todo(file_info.original_name)
+            pending_removals.append(file_info.original_name)
         else:
-            todo_list.add_file_issue(file_info, FileIssue.CORRUPTED_PDF)
-            todo_items.append({
-                "category": "corrupted",
-                "file": file_info.original_name,
-                "message": f"重新下载: {file_info.original_name} (PDF文件损坏)"
-            })
+            pending_issues.append((file_info, FileIssue.CORRUPTED_PDF))
+            todo_items.append((
+                "corrupted",
+                file_info.original_name,
+                f"重新下载: {file_info.original_name} (PDF文件损坏)",
+            ))
     
     # Process small files
     for file_info in small_files:
         if config.delete_small:
             files_to_delete.append(file_info.original_path)
             cleanup_result.deleted_small.append(file_info.original_path)
-            todo_list.remove_file_from_todo(file_info.original_name)
+            pending_removals.append(file_info.original_name)
         elif config.auto_cleanup:
             # Auto-cleanup mode: add to todo for manual review (might be valid small ebook)
-            todo_list.add_failed_download(file_info)
-            todo_items.append({
-                "category": "too_small",
-                "file": file_info.original_name,
-                "message": f"检查文件: {file_info.original_name} (文件过小 {file_info.size} 字节，可能需要重新下载)"
-            })
+            pending_issues.append((file_info, FileIssue.TOO_SMALL))
+            todo_items.append((
+                "too_small",
+                file_info.original_name,
+                f"检查文件: {file_info.original_name} (文件过小 {file_info.size} 字节，可能需要重新下载)",
+            ))
         else:
-            todo_list.add_failed_download(file_info)
-            todo_items.append({
-                "category": "too_small",
-                "file": file_info.original_name,
-                "message": f"检查并重新下载: {file_info.original_name} (文件过小，仅 {file_info.size} 字节)"
-            })
+            pending_issues.append((file_info, FileIssue.TOO_SMALL))
+            todo_items.append((
+                "too_small",
+                file_info.original_name,
+                f"检查并重新下载: {file_info.original_name} (文件过小，仅 {file_info.size} 字节)",
+            ))
+    
+    todo_list.remove_files_from_todo(pending_removals)
+    todo_list.add_file_issues(pending_issues)
     
     # Analyze other files for integrity
     for file_info in normalized:
-        if (file_info not in incomplete_downloads and 
-            file_info not in corrupted_files and 
-            file_info not in small_files):
+        if file_info not in categorized:
             todo_list.analyze_file_integrity(file_info)
 
     # Detect duplicates
     detector = DuplicateDetector()
     duplicate_groups, clean_files = detector.detect_duplicates(normalized)
-    logging.info(f"Detected {len(duplicate_groups)} duplicate groups")
+    logger.info("Detected %d duplicate groups", len(duplicate_groups))
 
     # Sort todo items by category, then file for deterministic output (matching Rust)
-    todo_items.sort(key=lambda x: (x["category"], x["file"]))
+    # Items are (category, file, message) tuples; the key leaves out the
+    # message so equal (category, file) pairs keep their scan order.
+    todo_items.sort(key=operator.itemgetter(0, 1))
 
     # Output results
     if config.dry_run:
         if config.json:
             # JSON output
+            from .jsonoutput import JSONOutput
             output = JSONOutput.from_results(
                 clean_files, duplicate_groups, files_to_delete, todo_items, config.path
             )
-            json_str = JSONOutput.to_json(output)
-            print(json_str)
+            JSONOutput.write_json(output, sys.stdout)
         else:
             # Human-readable output
             print_human_output(clean_files, duplicate_groups, files_to_delete, todo_list)
@@ -407,7 +511,7 @@ def print_cleanup_summary(result: CleanupResult) -> None:
     if result.failed_deletions:
         print(f"  ⚠️  删除失败: {len(result.failed_deletions)} 个")
         for path, error in result.failed_deletions[:3]:
-            print(f"     • {os.path.basename(path)}: {error}")
+            print(f"     • {path.rpartition(os.sep)[2]}: {error}")
     
     print("-" * 40)
 
@@ -455,44 +559,49 @@ def print_human_output(clean_files, duplicate_groups, files_to_delete, todo_list
 def execute_operations(clean_files, duplicate_groups, files_to_delete, 
                        todo_list, config: Config, cleanup_result: CleanupResult) -> CleanupResult:
     """Execute the file operations."""
+    # Skip building per-file log records entirely when INFO is disabled
+    log_info = logger.isEnabledFor(logging.INFO)
+    
     # Execute renames
     for file_info in clean_files:
         if file_info.new_name:
             os.rename(file_info.original_path, file_info.new_path)
-            logging.info(f"Renamed: {file_info.original_name} -> {file_info.new_name}")
+            if log_info:
+                logger.info("Renamed: %s -> %s", file_info.original_name, file_info.new_name)
     
     # Delete duplicates
     if not config.no_delete:
-        for group in duplicate_groups:
-            if len(group) > 1:
-                for i, path in enumerate(group):
-                    if i > 0:
-                        try:
-                            os.remove(path)
-                            logging.info(f"Deleted duplicate: {path}")
-                        except OSError as e:
-                            logging.error(f"Failed to delete duplicate: {path}: {e}")
+        duplicate_paths = [path for group in duplicate_groups if len(group) > 1
+                           for path in group[1:]]
+        for path, error in remove_paths(duplicate_paths):
+            if error is None:
+                if log_info:
+                    logger.info("Deleted duplicate: %s", path)
+            else:
+                logger.error("Failed to delete duplicate: %s: %s", path, error)
     
     # Delete problematic files (incomplete downloads, corrupted, small)
     if files_to_delete:
-        for path in files_to_delete:
-            try:
-                os.remove(path)
-                logging.info(f"Deleted problematic file: {path}")
-            except OSError as e:
-                logging.error(f"Failed to delete file: {path}: {e}")
-                cleanup_result.failed_deletions.append((path, str(e)))
-                # Remove from the deleted lists if deletion failed
-                if path in cleanup_result.deleted_incomplete:
-                    cleanup_result.deleted_incomplete.remove(path)
-                if path in cleanup_result.deleted_corrupted:
-                    cleanup_result.deleted_corrupted.remove(path)
-                if path in cleanup_result.deleted_small:
-                    cleanup_result.deleted_small.remove(path)
+        failed_paths = set()
+        for path, error in remove_paths(files_to_delete):
+            if error is None:
+                if log_info:
+                    logger.info("Deleted problematic file: %s", path)
+            else:
+                logger.error("Failed to delete file: %s: %s", path, error)
+                cleanup_result.failed_deletions.append((path, error))
+                failed_paths.add(path)
+        
+        # Remove failed paths from the deleted lists in a single pass each
+        if failed_paths:
+            for deleted in (cleanup_result.deleted_incomplete,
+                            cleanup_result.deleted_corrupted,
+                            cleanup_result.deleted_small):
+                deleted[:] = [path for path in deleted if path not in failed_paths]
     
     # Write todo.md
     todo_list.write()
-    logging.info("Wrote todo.md")
+    logger.info("Wrote todo.md")
     
     return cleanup_result
 
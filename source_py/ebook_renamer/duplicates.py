@@ -2,27 +2,76 @@
 Duplicate detection functionality for the ebook renamer.
 """
 
+import functools
 import hashlib
 import os
-from typing import List, Tuple
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter
+from typing import List, Optional, Set, Tuple
 
 from .types import FileInfo
 
+# Content hash used to confirm duplicates. Digests are only compared with
+# each other within a run, so any hash works; prefer the SIMD-accelerated
+# optional backends and fall back to MD5.
+try:
+    from blake3 import blake3 as content_hash
+except ImportError:
+    try:
+        from xxhash import xxh3_128 as content_hash
+    except ImportError:
+        content_hash = hashlib.md5
+
+HAS_FADVISE = hasattr(os, "posix_fadvise")
+
+
+def _is_rotational(path: str) -> bool:
+    """Return True if path lives on a spinning disk (Linux only).
+    
+    Looks up the block device in sysfs; partitions inherit the queue of
+    their parent disk. Anything that can't be resolved counts as
+    non-rotational.
+    """
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        dev = os.stat(path).st_dev
+    except OSError:
+        return False
+    sys_dev = f"/sys/dev/block/{os.major(dev)}:{os.minor(dev)}"
+    for queue in (f"{sys_dev}/queue/rotational", f"{sys_dev}/../queue/rotational"):
+        try:
+            with open(queue) as f:
+                return f.read().strip() == "1"
+        except OSError:
+            continue
+    return False
+
 
 class DuplicateDetector:
-    """Handles duplicate detection based on MD5 hash."""
+    """Handles duplicate detection based on content hash."""
     
     # Allowed formats to keep
     ALLOWED_EXTENSIONS = {".pdf", ".epub", ".txt"}
     
+    # Bytes read from each end of a file for the cheap pre-hash fingerprint
+    FINGERPRINT_SIZE = 4096
+    
+    HASH_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+    # Parallel reads on a spinning disk only add seeks
+    ROTATIONAL_HASH_WORKERS = 2
+    HASH_WORKERS_ENV = "EBOOK_RENAMER_HASH_WORKERS"
+    HASH_BUFFER_SIZE = 1 << 20
+    
     def detect_duplicates(self, files: List[FileInfo], skip_hash: bool = False) -> Tuple[List[List[str]], List[FileInfo]]:
-        """Find duplicate files based on MD5 hash or filename."""
+        """Find duplicate files based on content hash or filename."""
         # Filter to only allowed formats first
         filtered_files = [file for file in files
                          if file.extension in self.ALLOWED_EXTENSIONS]
 
         # Build hash map: key -> list of file infos
-        # Key is either MD5 hash or normalized filename depending on skip_hash
+        # Key is either content hash or normalized filename depending on skip_hash
         hash_map = {}
 
         if skip_hash:
@@ -36,52 +85,59 @@ class DuplicateDetector:
                     hash_map[key].append(file_info)
         else:
             # Optimization: Group by size first
-            # Only compute MD5 for files that have the same size
+            # Only hash files that have the same size
             size_map = {}
 
             for file_info in filtered_files:
                 if not file_info.is_failed_download and not file_info.is_too_small:
-                    if file_info.size not in size_map:
-                        size_map[file_info.size] = []
-                    size_map[file_info.size].append(file_info)
+                    size_map.setdefault(file_info.size, []).append(file_info)
 
+            files_to_hash = []
             for files_with_same_size in size_map.values():
                 # If only one file has this size, it cannot be a duplicate
                 if len(files_with_same_size) == 1:
                     continue
 
-                # Multiple files with same size, compute hashes
-                for file_info in files_with_same_size:
-                    try:
-                        file_hash = self._compute_md5(file_info.original_path)
-                        if file_hash not in hash_map:
-                            hash_map[file_hash] = []
-                        hash_map[file_hash].append(file_info)
-                    except (OSError, IOError):
-                        # Skip files that can't be read
-                        continue
+                # Files larger than the fingerprint window are first compared
+                # by their head and tail; only files sharing a fingerprint
+                # with another file can be duplicates and need a full hash.
+                if files_with_same_size[0].size > 2 * self.FINGERPRINT_SIZE:
+                    candidates = self._fingerprint_candidates(files_with_same_size)
+                    files_with_same_size = [file_info for file_info in files_with_same_size
+                                            if file_info in candidates]
+
+                files_to_hash.extend(files_with_same_size)
+
+            # Multiple files with same size, compute hashes
+            for file_info, file_hash in zip(files_to_hash, self._hash_files(files_to_hash)):
+                # Skip files that can't be read
+                if file_hash is not None:
+                    hash_map.setdefault(file_hash, []).append(file_info)
         
         # Group duplicates by hash and apply retention strategy
         duplicate_groups = []
-        duplicate_paths = set()
+        # id() of every non-kept duplicate; int keys avoid hashing and
+        # comparing full path strings in the clean-file pass
+        duplicate_ids = set()
         
         for file_infos in hash_map.values():
             if len(file_infos) > 1:
                 # Multiple files with same hash - apply retention strategy
                 kept_file = self._select_file_to_keep(file_infos)
                 
-                group_paths = [kept_file.original_path]
-                
-                for file_info in file_infos:
-                    if file_info.original_path != kept_file.original_path:
-                        duplicate_paths.add(file_info.original_path)
-                        group_paths.append(file_info.original_path)
-                
-                duplicate_groups.append(group_paths)
+                other_files = [file_info for file_info in file_infos
+                               if file_info is not kept_file]
+                duplicate_ids.update(map(id, other_files))
+                duplicate_groups.append([kept_file.original_path] +
+                                        [file_info.original_path for file_info in other_files])
+        
+        # Without duplicates every filtered file is clean; skip the second pass
+        if not duplicate_ids:
+            return duplicate_groups, filtered_files
         
         # Return only non-duplicate files (including filtered out formats)
-        clean_files = [file for file in filtered_files 
-                      if file.original_path not in duplicate_paths]
+        clean_files = [file for file in filtered_files
+                       if id(file) not in duplicate_ids]
         
         return duplicate_groups, clean_files
     
@@ -92,38 +148,105 @@ class DuplicateDetector:
         candidates = normalized_files if normalized_files else files
         
         # Priority 2: Shortest path (fewest directory components) among candidates
-        candidates_with_depth = []
-        min_depth = float('inf')
-        
-        for file in candidates:
-            depth = file.original_path.count('/')
-            candidates_with_depth.append((depth, file))
-            if depth < min_depth:
-                min_depth = depth
+        depths = [file.original_path.count('/') for file in candidates]
+        min_depth = min(depths)
         
         # Filter to shallowest candidates
-        shallowest_candidates = [file for depth, file in candidates_with_depth 
-                                if depth == min_depth]
-        
-        # Priority 3: Newest modification time among the shallowest candidates
-        if not shallowest_candidates:
-            # Fallback: return first file
-            return files[0]
+        shallowest_candidates = [file for depth, file in zip(depths, candidates)
+                                 if depth == min_depth]
         
-        newest_file = shallowest_candidates[0]
-        for file in shallowest_candidates[1:]:
-            if file.modified_time > newest_file.modified_time:
-                newest_file = file
+        # Priority 3: Newest modification time among the shallowest candidates;
+        # max() keeps the first file on ties, like the strict > comparison did
+        return max(shallowest_candidates, key=attrgetter('modified_time'))
+    
+    def _fingerprint_candidates(self, files: List[FileInfo]) -> Set[FileInfo]:
+        """Return the files whose head+tail fingerprint matches another file's."""
+        fingerprint_map = {}
+        for file_info in files:
+            try:
+                fingerprint = self._compute_fingerprint(file_info.original_path, file_info.size)
+            except (OSError, IOError):
+                # Unreadable files are skipped, as in the hashing pass
+                continue
+            fingerprint_map.setdefault(fingerprint, []).append(file_info)
         
-        return newest_file
+        return {file_info for group in fingerprint_map.values() if len(group) > 1
+                for file_info in group}
     
-    def _compute_md5(self, file_path: str) -> str:
-        """Calculate MD5 hash of a file."""
-        hash_md5 = hashlib.md5()
+    def _compute_fingerprint(self, file_path: str, size: int) -> bytes:
+        """Read the first and last FINGERPRINT_SIZE bytes of a file."""
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+            head = f.read(self.FINGERPRINT_SIZE)
+            f.seek(max(size - self.FINGERPRINT_SIZE, 0))
+            tail = f.read(self.FINGERPRINT_SIZE)
+        return head + tail
+    
+    def _hash_files(self, files: List[FileInfo]) -> List[Optional[str]]:
+        """Compute content hashes for files, None for unreadable ones.
+        
+        Hashing runs on a thread pool (the hash backends release the GIL
+        for large updates); results are returned in input order.
+        """
+        if len(files) <= 1:
+            return [self._try_compute_hash(file_info.original_path) for file_info in files]
+        
+        workers = self._hash_workers(files[0].original_path)
+        if workers <= 1:
+            return [self._try_compute_hash(file_info.original_path) for file_info in files]
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self._try_compute_hash,
+                                     [file_info.original_path for file_info in files]))
+    
+    def _hash_workers(self, sample_path: str) -> int:
+        """Pick the hashing thread count for the device holding sample_path.
+        
+        EBOOK_RENAMER_HASH_WORKERS overrides the choice when set to a
+        positive integer.
+        """
+        override = os.environ.get(self.HASH_WORKERS_ENV)
+        if override:
+            try:
+                workers = int(override)
+            except ValueError:
+                workers = 0
+            if workers > 0:
+                return workers
+        
+        if _is_rotational(sample_path):
+            return self.ROTATIONAL_HASH_WORKERS
+        return self.HASH_WORKERS
+    
+    def _try_compute_hash(self, file_path: str) -> Optional[str]:
+        """Calculate the content hash of a file, or None if it can't be read."""
+        try:
+            return self._compute_hash(file_path)
+        except (OSError, IOError):
+            return None
+    
+    def _compute_hash(self, file_path: str) -> str:
+        """Calculate the content hash of a file.
+        
+        Reads 1 MiB at a time into a reused buffer, with readahead hints on
+        platforms that support posix_fadvise. On HDDs this is seek-bound and
+        on SSD/NVMe hash-bound, hence the per-device worker count.
+        """
+        hasher = content_hash()
+        buf = bytearray(self.HASH_BUFFER_SIZE)
+        view = memoryview(buf)
+        with open(file_path, "rb", buffering=0) as f:
+            fd = f.fileno()
+            if HAS_FADVISE:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            while True:
+                n = f.readinto(buf)
+                if not n:
+                    break
+                hasher.update(view[:n])
+            if HAS_FADVISE:
+                # The library is usually larger than RAM; don't keep it cached
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        return hasher.hexdigest()
     
     def detect_name_variants(self, files: List[FileInfo]) -> List[List[int]]:
         """Group files by normalized name (treating (1), (2), etc. as variants)."""
@@ -142,13 +265,17 @@ class DuplicateDetector:
         variants = [group for group in name_groups.values() if len(group) > 1]
         return variants
     
-    def _strip_variant_suffix(self, filename: str) -> str:
-        """Strip patterns like " (1)", " (2)", etc. from the end before extension."""
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _strip_variant_suffix(filename: str) -> str:
+        """Strip patterns like " (1)", " (2)", etc. from the end before extension.
+        
+        Memoized, as the result depends only on the filename; the cache is
+        bounded so a long-lived process doesn't keep every name it has seen.
+        """
         # Match patterns like " (1)", " (2)", etc. at the end before extension
-        if '.' in filename:
-            name_part = filename.rsplit('.', 1)[0]
-            ext_part = filename.rsplit('.', 1)[1]
-            
+        name_part, sep, ext_part = filename.rpartition('.')
+        if sep:
             # Remove variant suffix from name part
             if name_part.endswith(')'):
                 # Check if it matches pattern " (n)"
@@ -0,0 +1,88 @@
+"""
+File removal helpers shared by the CLI and the TUI.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+
+# Deletions are only dispatched to a thread pool above this many paths;
+# for small batches the pool overhead outweighs the syscall latency.
+PARALLEL_DELETE_THRESHOLD = 16
+DELETE_WORKERS = 16
+# Files per unlinkat batch sharing one directory fd (one pool task each)
+DELETE_CHUNK_SIZE = 64
+
+# Unlinking relative to an open parent directory saves the kernel from
+# resolving the directory part of every path. O_PATH needs no read
+# permission on the directory, only what unlink itself requires.
+UNLINK_DIR_FD = os.unlink in os.supports_dir_fd
+DIR_OPEN_FLAGS = getattr(os, "O_PATH", os.O_RDONLY) | getattr(os, "O_DIRECTORY", 0)
+
+
+def _try_remove(path: str) -> Tuple[str, Optional[str]]:
+    """Remove a file, returning (path, None) on success or (path, error)."""
+    try:
+        os.remove(path)
+        return path, None
+    except OSError as e:
+        return path, str(e)
+
+
+def _remove_in_dir(dir_path: str, entries: List[Tuple[int, str, str]]
+                   ) -> List[Tuple[int, str, Optional[str]]]:
+    """Remove (index, path, name) entries sharing a parent directory.
+    
+    Errors are reported with the full path, as os.remove would.
+    """
+    try:
+        dir_fd = os.open(dir_path or os.curdir, DIR_OPEN_FLAGS)
+    except OSError:
+        return [(index,) + _try_remove(path) for index, path, _name in entries]
+    
+    results = []
+    try:
+        for index, path, name in entries:
+            try:
+                os.unlink(name, dir_fd=dir_fd)
+                results.append((index, path, None))
+            except OSError as e:
+                results.append((index, path, str(OSError(e.errno, e.strerror, path))))
+    finally:
+        os.close(dir_fd)
+    return results
+
+
+def remove_paths(paths: List[str]) -> List[Tuple[str, Optional[str]]]:
+    """Remove files, in parallel for large batches.
+    
+    Files are grouped by parent directory and unlinked relative to it
+    where the platform supports dir_fd. Results are returned in input
+    order so logging stays deterministic.
+    """
+    if not UNLINK_DIR_FD:
+        if len(paths) <= PARALLEL_DELETE_THRESHOLD:
+            return [_try_remove(path) for path in paths]
+        with ThreadPoolExecutor(max_workers=DELETE_WORKERS) as executor:
+            return list(executor.map(_try_remove, paths))
+    
+    by_dir = {}
+    for index, path in enumerate(paths):
+        dir_path, name = os.path.split(path)
+        by_dir.setdefault(dir_path, []).append((index, path, name))
+    batches = [(dir_path, entries[i:i + DELETE_CHUNK_SIZE])
+               for dir_path, entries in by_dir.items()
+               for i in range(0, len(entries), DELETE_CHUNK_SIZE)]
+    
+    if len(paths) <= PARALLEL_DELETE_THRESHOLD:
+        batch_results = [_remove_in_dir(dir_path, entries) for dir_path, entries in batches]
+    else:
+        with ThreadPoolExecutor(max_workers=DELETE_WORKERS) as executor:
+            batch_results = list(executor.map(lambda batch: _remove_in_dir(*batch), batches))
+    
+    results: List[Tuple[str, Optional[str]]] = [None] * len(paths)
+    for batch in batch_results:
+        for index, path, error in batch:
+            results[index] = (path, error)
+    return results
@@ -4,7 +4,14 @@ JSON output functionality for the ebook renamer.
 
 import json
 import os
-from typing import List, Dict, Any
+from operator import attrgetter
+from typing import List, Dict, Any, Optional, TextIO, Tuple
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 from .types import (
     OperationsOutput, RenameOperation, DuplicateGroup, 
@@ -19,7 +26,7 @@ class JSONOutput:
     def from_results(clean_files: List[FileInfo], 
                     duplicate_groups: List[List[str]], 
                     files_to_delete: List[str], 
-                    todo_items: List[Dict[str, str]], 
+                    todo_items: List[Tuple[str, str, str]], 
                     target_dir: str) -> OperationsOutput:
         """Create an OperationsOutput from processing results."""
         output = OperationsOutput(
@@ -29,12 +36,15 @@ class JSONOutput:
             todo_items=[]
         )
         
+        # Paths under the target directory are made relative by slicing
+        target_prefix = os.path.abspath(target_dir).rstrip(os.sep) + os.sep
+        
         # Add renames
         renames = []
         for file in clean_files:
             if file.new_name is not None:
-                from_path = JSONOutput._make_relative_path(file.original_path, target_dir)
-                to_path = JSONOutput._make_relative_path(file.new_path, target_dir)
+                from_path = JSONOutput._make_relative_path(file.original_path, target_dir, target_prefix)
+                to_path = JSONOutput._make_relative_path(file.new_path, target_dir, target_prefix)
                 
                 renames.append(RenameOperation(
                     from_path=from_path,
@@ -43,15 +53,15 @@ class JSONOutput:
                 ))
         
         # Sort renames by 'from' path for deterministic output
-        renames.sort(key=lambda x: x.from_path)
+        renames.sort(key=attrgetter("from_path"))
         output.renames = renames
         
         # Add duplicate deletions
         duplicate_deletes = []
         for group in duplicate_groups:
             if len(group) > 1:
-                keep_path = JSONOutput._make_relative_path(group[0], target_dir)
-                delete_paths = [JSONOutput._make_relative_path(path, target_dir) 
+                keep_path = JSONOutput._make_relative_path(group[0], target_dir, target_prefix)
+                delete_paths = [JSONOutput._make_relative_path(path, target_dir, target_prefix) 
                               for path in group[1:]]
                 # Sort delete paths for deterministic output
                 delete_paths.sort()
@@ -62,30 +72,74 @@ class JSONOutput:
                 ))
         
         # Sort duplicate groups by 'keep' path for deterministic output
-        duplicate_deletes.sort(key=lambda x: x.keep)
+        duplicate_deletes.sort(key=attrgetter("keep"))
         output.duplicate_deletes = duplicate_deletes
         
         # Add small/corrupted deletions
         small_deletes = []
         for path in files_to_delete:
             small_deletes.append(DeleteOperation(
-                path=JSONOutput._make_relative_path(path, target_dir),
+                path=JSONOutput._make_relative_path(path, target_dir, target_prefix),
                 issue="deleted"
             ))
         
         # Sort by path for deterministic output
-        small_deletes.sort(key=lambda x: x.path)
+        small_deletes.sort(key=attrgetter("path"))
         output.small_or_corrupted_deletes = small_deletes
         
         # Add todo items (already sorted by category and file in CLI)
-        output.todo_items = [TodoItem(**item) for item in todo_items]
+        output.todo_items = [TodoItem(category, file, message)
+                             for category, file, message in todo_items]
         
         return output
     
     @staticmethod
     def to_json(output: OperationsOutput) -> str:
         """Convert the OperationsOutput to a JSON string."""
-        # Convert to dict for JSON serialization
+        data = JSONOutput._to_dict(output)
+        
+        if ORJSON_AVAILABLE:
+            try:
+                # Same layout as json.dumps(indent=2, ensure_ascii=False)
+                return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode("utf-8")
+            except orjson.JSONEncodeError:
+                # e.g. lone surrogates from undecodable filenames
+                pass
+        
+        return json.dumps(data, indent=2, ensure_ascii=False)
+    
+    @staticmethod
+    def write_json(output: OperationsOutput, stream: TextIO) -> None:
+        """Write the OperationsOutput as JSON plus a newline to a text stream.
+        
+        Produces the same text as print(to_json(output), file=stream) without
+        holding the whole document as a str: orjson's UTF-8 bytes go straight
+        to the underlying binary buffer, and the stdlib fallback writes the
+        encoder's chunks as they are produced.
+        """
+        data = JSONOutput._to_dict(output)
+        
+        buffer = getattr(stream, "buffer", None)
+        if ORJSON_AVAILABLE and buffer is not None:
+            try:
+                encoded = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+            except orjson.JSONEncodeError:
+                encoded = None
+            if encoded is not None:
+                stream.flush()
+                buffer.write(encoded)
+                buffer.write(b"\n")
+                buffer.flush()
+                return
+        
+        encoder = json.JSONEncoder(indent=2, ensure_ascii=False)
+        for chunk in encoder.iterencode(data):
+            stream.write(chunk)
+        stream.write("\n")
+    
+    @staticmethod
+    def _to_dict(output: OperationsOutput) -> Dict[str, Any]:
+        """Convert the OperationsOutput to plain dicts for JSON serialization."""
         data = {
             "renames": [
                 {
@@ -118,12 +172,23 @@ class JSONOutput:
                 for item in output.todo_items
             ]
         }
-        
-        return json.dumps(data, indent=2, ensure_ascii=False)
+        return data
     
     @staticmethod
-    def _make_relative_path(path: str, target_dir: str) -> str:
-        """Convert an absolute path to a relative path using forward slashes."""
+    def _make_relative_path(path: str, target_dir: str,
+                            target_prefix: Optional[str] = None) -> str:
+        """Convert an absolute path to a relative path using forward slashes.
+        
+        target_prefix is the absolute target directory with a trailing
+        separator. Already-normalized paths below it are sliced directly,
+        which gives the same result as os.path.relpath without its
+        abspath/split work.
+        """
+        if target_prefix is not None and path.startswith(target_prefix):
+            rel_path = path[len(target_prefix):]
+            if not JSONOutput._needs_normalizing(rel_path):
+                return rel_path.replace('\\', '/')
+        
         # Convert to relative path
         try:
             rel_path = os.path.relpath(path, target_dir)
@@ -139,3 +204,12 @@ class JSONOutput:
             rel_path = ''
         
         return rel_path
+    
+    @staticmethod
+    def _needs_normalizing(rel_path: str) -> bool:
+        """Check whether os.path.relpath could rewrite a sliced relative path."""
+        padded = os.sep + rel_path
+        return ((os.sep + '.') in padded
+                or (os.sep + os.sep) in padded
+                or rel_path.endswith(os.sep)
+                or (os.altsep is not None and os.altsep in rel_path))
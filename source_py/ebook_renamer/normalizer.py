@@ -2,8 +2,11 @@
 Filename normalization functionality for the ebook renamer.
 """
 
+import functools
 import re
 import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import List, Optional, Tuple
 
 from .types import FileInfo, ParsedMetadata
@@ -14,37 +17,141 @@ class Normalizer:
     
     # Regex patterns
     YEAR_REGEX = re.compile(r'\b(?:19|20)\d{2}\b')
+    # Every match contains "uth"; callers test for it before running the regex
     AUTH_REGEX = re.compile(r'\s*\([Aa]uth\.?\).*')
     SPACE_REGEX = re.compile(r'\s{2,}')
     BRACKET_REGEX = re.compile(r'\s*\[[^\]]*\]')
-    TRAILING_ID_REGEX = re.compile(r'[-_][A-Za-z0-9]{8,}$')
     SIMPLE_PAREN_REGEX = re.compile(r'\([^)]+\)')
     # Matches simple nested parens: ( ... ( ... ) ... )
     NESTED_PAREN_REGEX = re.compile(r'\([^()]*(?:\([^()]*\)[^()]*)*\)')
     TRAILING_AUTHOR_REGEX = re.compile(r'^(.+?)\s*\(([^)]+)\)\s*$')
     SEPARATOR_REGEX = re.compile(r'^(.+?)\s*[-:]\s+(.+)$')
     MULTI_AUTHOR_REGEX = re.compile(r'^([A-Z][^:]+?),\s*([A-Z][^:]+?)\s*[-:]\s+(.+)$')
+    BRACKET_CHAR_REGEX = re.compile(r'[()\[\]]')
+    GENERIC_SERIES_REGEX = re.compile(r'^\s*\(([^)]+)\)\s+(.+)$')
+    AUTHOR_SEPARATOR_REGEX = re.compile(r'(?:--|[-:])')
+    
+    # Series prefixes stripped from the start of a name, tried in order
+    SERIES_PREFIXES = (
+        "London Mathematical Society Lecture Note Series",
+        "Graduate Texts in Mathematics",
+        "Progress in Mathematics",
+        "[Springer-Lehrbuch]",
+        "[Graduate studies in mathematics",
+        "[Progress in Mathematics №",
+        "[AMS Mathematical Surveys and Monographs",
+    )
+    SERIES_PREFIX_REGEX = re.compile('|'.join(re.escape(p) for p in SERIES_PREFIXES))
+    
+    # Lowercase substrings that rule out a string being an author name
+    NON_AUTHOR_KEYWORDS = (
+        "auth.", "translator", "translated by", "z-library", "libgen", "anna's archive", "2-library",
+    )
+    NON_AUTHOR_REGEX = re.compile('|'.join(re.escape(k) for k in NON_AUTHOR_KEYWORDS))
+    
+    # Substrings marking a parenthetical or suffix as publisher/series info
+    PUBLISHER_KEYWORDS = (
+        "Press", "Publishing", "Academic Press", "Springer", "Cambridge", "Oxford", "MIT Press",
+        "Series", "Textbook Series", "Graduate Texts", "Graduate Studies", "Lecture Notes",
+        "Pure and Applied", "Mathematics", "Foundations of", "Monographs", "Studies", "Collection",
+        "Textbook", "Edition", "Vol.", "Volume", "No.", "Part", "理工", "出版社", "の",
+    )
+    PUBLISHER_KEYWORD_REGEX = re.compile('|'.join(re.escape(k) for k in PUBLISHER_KEYWORDS))
+    # Stricter set used for suffix stripping (no parens)
+    STRICT_PUBLISHER_KEYWORDS = (
+        "Press", "Publishing", "Springer", "Cambridge", "Oxford", "MIT", "Wiley", "Elsevier",
+        "Routledge", "Pearson", "McGraw", "Addison", "Prentice", "O'Reilly", "Princeton",
+        "Harvard", "Yale", "Stanford", "Chicago", "California", "Columbia", "University",
+        "Verlag", "Birkhäuser", "CUP",
+    )
+    STRICT_PUBLISHER_REGEX = re.compile('|'.join(re.escape(k) for k in STRICT_PUBLISHER_KEYWORDS))
+    UNDERSCORE_TABLE = str.maketrans('_', ' ')
+    DIGIT_SEPARATOR_TABLE = str.maketrans('', '', '-_')
+    
+    # Noise removed in order, each paired with a literal every match contains
+    NOISE_PATTERNS = tuple((literal, re.compile(pattern)) for literal, pattern in (
+        ("Library", r'\s*[-\(]?\s*[zZ]-?Library(?:\.pdf)?\s*[)\.]?'),
+        ("libgen", r'\s*[-\(]?\s*libgen(?:\.li)?(?:\.pdf)?\s*[)\.]?'),
+        ("Archive", r'\s*[-\(]?\s*Anna\'?s?\s+Archive(?:\.pdf)?\s*[)\.]?'),
+        # Hash patterns
+        ("--", r'\s*--\s*[a-f0-9]{32}\s*(?:--)?'),
+        ("--", r'\s*--\s*\d{10,13}\s*(?:--)?'),
+        ("--", r'\s*--\s*[A-Za-z0-9]{16,}\s*(?:--)?'),
+        ("--", r'\s*--\s*[a-f0-9]{8,}\s*(?:--)?'),
+    ))
+    
+    # Below this many files, process pool startup costs more than it saves
+    PARALLEL_THRESHOLD = 2000
     
     def normalize_files(self, files: List[FileInfo]) -> List[FileInfo]:
         """Normalize filenames according to the specification."""
-        result = []
+        # Skip normalization for failed/damaged files
+        to_normalize = [file for file in files
+                        if not file.is_failed_download and not file.is_too_small]
         
-        for file in files:
-            # Skip normalization for failed/damaged files
-            if file.is_failed_download or file.is_too_small:
-                result.append(file)
-                continue
-            
-            metadata = self._parse_filename(file.original_name, file.extension)
-            new_name = self._generate_new_filename(metadata, file.extension)
-            
+        # The result depends only on (name, extension); copies of one book
+        # in different folders are parsed once
+        keys = [(file.original_name, file.extension) for file in to_normalize]
+        unique_keys = list(dict.fromkeys(keys))
+        
+        if len(unique_keys) >= self.PARALLEL_THRESHOLD:
+            unique_names = self._normalize_names_parallel(unique_keys)
+        else:
+            unique_names = [self._normalize_name(filename, extension)
+                            for filename, extension in unique_keys]
+        new_names = dict(zip(unique_keys, unique_names))
+        
+        # os.path.join(os.path.dirname(path), "") per parent directory;
+        # appending the new name to it equals joining the two
+        dir_prefixes = {}
+        for file, key in zip(to_normalize, keys):
             # Update file info
+            new_name = new_names[key]
             file.new_name = new_name
-            dir_name = os.path.dirname(file.original_path)
-            file.new_path = os.path.join(dir_name, new_name)
-            result.append(file)
+            parent = self._parent_key(file)
+            if parent is None:
+                file.new_path = os.path.join(os.path.dirname(file.original_path), new_name)
+                continue
+            dir_prefix = dir_prefixes.get(parent)
+            if dir_prefix is None:
+                dir_prefix = os.path.join(os.path.dirname(file.original_path), "")
+                dir_prefixes[parent] = dir_prefix
+            file.new_path = dir_prefix + new_name
         
-        return result
+        return list(files)
+    
+    @staticmethod
+    def _parent_key(file: FileInfo) -> Optional[str]:
+        """Return original_path up to its last separator, or None if unsure."""
+        path = file.original_path
+        name = file.original_name
+        if not path.endswith(name):
+            return None
+        parent = path[:len(path) - len(name)]
+        if parent and not parent.endswith((os.sep, os.altsep or os.sep)):
+            return None
+        return parent
+    
+    def _normalize_name(self, filename: str, extension: str) -> str:
+        """Compute the normalized filename for one file."""
+        metadata = self._parse_filename(filename, extension)
+        return self._generate_new_filename(metadata, extension)
+    
+    def _normalize_names_parallel(self, names: List[Tuple[str, str]]) -> List[str]:
+        """Normalize (filename, extension) pairs on a process pool, in order.
+        
+        Parsing is pure Python and holds the GIL, so threads would not
+        help. Falls back to the sequential loop if no pool can be started.
+        """
+        workers = os.cpu_count() or 1
+        if workers > 1:
+            chunksize = max(1, len(names) // (workers * 4))
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    return list(executor.map(_normalize_name, names, chunksize=chunksize))
+            except (OSError, BrokenProcessPool):
+                pass
+        return [self._normalize_name(filename, extension) for filename, extension in names]
     
     def _parse_filename(self, filename: str, extension: str) -> ParsedMetadata:
         """Parse a filename into metadata components."""
@@ -81,35 +188,22 @@ class Normalizer:
         )
     
     def _remove_series_prefixes(self, s: str) -> str:
-        prefixes = [
-            "London Mathematical Society Lecture Note Series",
-            "Graduate Texts in Mathematics",
-            "Progress in Mathematics",
-            "[Springer-Lehrbuch]",
-            "[Graduate studies in mathematics",
-            "[Progress in Mathematics №",
-            "[AMS Mathematical Surveys and Monographs",
-        ]
-
         result = s
-        for prefix in prefixes:
-            if result.startswith(prefix):
-                result = result[len(prefix):]
-                result = result.lstrip("- ]")
-                break
+        match = self.SERIES_PREFIX_REGEX.match(result)
+        if match:
+            result = result[match.end():]
+            result = result.lstrip("- ]")
 
         # Generic pattern: (Series Name) Author - Title
         # If it starts with (...), check if the next part looks like an author
-        re_generic = re.compile(r'^\s*\(([^)]+)\)\s+(.+)$')
-        match = re_generic.match(result)
+        match = self.GENERIC_SERIES_REGEX.match(result)
         if match:
             # series_part = match.group(1)
             rest_part = match.group(2)
 
             # Check if 'rest_part' starts with an author
             # We look for the first separator (- or :) to isolate the potential author
-            re_sep = re.compile(r'(?:--|[-:])')
-            sep_match = re_sep.search(rest_part)
+            sep_match = self.AUTHOR_SEPARATOR_REGEX.search(rest_part)
             potential_author = rest_part
             if sep_match:
                 potential_author = rest_part[:sep_match.start()]
@@ -120,63 +214,64 @@ class Normalizer:
         return result.strip()
 
     def _clean_noise_sources(self, s: str) -> str:
-        patterns = [
-            r'\s*[-\(]?\s*[zZ]-?Library(?:\.pdf)?\s*[)\.]?',
-            r'\s*[-\(]?\s*libgen(?:\.li)?(?:\.pdf)?\s*[)\.]?',
-            r'\s*[-\(]?\s*Anna\'?s?\s+Archive(?:\.pdf)?\s*[)\.]?',
-            # Hash patterns
-            r'\s*--\s*[a-f0-9]{32}\s*(?:--)?',
-            r'\s*--\s*\d{10,13}\s*(?:--)?',
-            r'\s*--\s*[A-Za-z0-9]{16,}\s*(?:--)?',
-            r'\s*--\s*[a-f0-9]{8,}\s*(?:--)?',
-        ]
         result = s
-        for pattern in patterns:
-            result = re.sub(pattern, "", result)
+        for literal, pattern in self.NOISE_PATTERNS:
+            # A pattern can only match if its literal is present; earlier
+            # removals may create one (e.g. "--"), so check the current string
+            if literal in result:
+                result = pattern.sub("", result)
         return result.strip()
 
     def _extract_year(self, s: str) -> Optional[int]:
         """Extract the last year found in the string."""
-        matches = self.YEAR_REGEX.findall(s)
-        if not matches:
+        # Keep only the last match instead of collecting all of them
+        match = None
+        for match in self.YEAR_REGEX.finditer(s):
+            pass
+        if match is None:
             return None
-        return int(matches[-1])
+        return int(match.group())
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _year_paren_regex(year: int) -> "re.Pattern[str]":
+        """Compile the (YYYY) / (YYYY, Publisher) pattern for a year, once per year."""
+        return re.compile(r'\s*\(\s*{}\s*(?:,\s*[^)]+)?\s*\)'.format(year))
 
     def _clean_parentheticals(self, s: str, year: Optional[int]) -> str:
         result = s
         
         # Pattern 1: Remove (YYYY, Publisher) or (YYYY)
         if year is not None:
-            pattern = re.compile(r'\s*\(\s*{}\s*(?:,\s*[^)]+)?\s*\)'.format(year))
-            result = pattern.sub("", result)
+            result = self._year_paren_regex(year).sub("", result)
             
         # Pattern 2: Remove nested parentheticals with publisher keywords
-        while True:
-            changed = False
-            def replace_nested(match):
-                nonlocal changed
-                content = match.group(0)
-                if self._is_publisher_or_series_info(content):
-                    changed = True
-                    return ""
-                return content
-            
-            new_result = self.NESTED_PAREN_REGEX.sub(replace_nested, result)
-            if not changed:
-                break
-            result = new_result
+        changed = True
+        while changed:
+            result, changed = self._remove_publisher_parens(self.NESTED_PAREN_REGEX, result)
             
         # Pattern 3: Remove simple parentheticals with publisher keywords
-        def replace_simple(match):
-            content = match.group(0)
-            if self._is_publisher_or_series_info(content):
-                return ""
-            return content
-            
-        result = self.SIMPLE_PAREN_REGEX.sub(replace_simple, result)
+        result, _ = self._remove_publisher_parens(self.SIMPLE_PAREN_REGEX, result)
         result = self.SPACE_REGEX.sub(" ", result)
         return result.strip()
 
+    def _remove_publisher_parens(self, pattern: "re.Pattern[str]", s: str) -> Tuple[str, bool]:
+        """Drop pattern matches that hold publisher/series info.
+        
+        Returns the new string and whether anything was removed.
+        """
+        pieces = []
+        start = 0
+        for match in pattern.finditer(s):
+            if self._is_publisher_or_series_info(match.group()):
+                pieces.append(s[start:match.start()])
+                start = match.end()
+        
+        if not pieces:
+            return s, False
+        pieces.append(s[start:])
+        return ''.join(pieces), True
+
     def _smart_parse_author_title(self, s: str) -> Tuple[Optional[str], str]:
         s = s.strip()
         
@@ -213,37 +308,38 @@ class Normalizer:
         if len(s) < 2:
             return False
             
-        non_author_keywords = [
-            "auth.", "translator", "translated by", "z-library", "libgen", "anna's archive", "2-library",
-        ]
-        s_lower = s.lower()
-        for k in non_author_keywords:
-            if k in s_lower:
-                return False
+        lowered = s.lower()
+        if self.NON_AUTHOR_REGEX.search(lowered):
+            return False
                 
         # Check if digits only
-        if all(c.isdigit() or c in '-_' for c in s):
+        digits = s.translate(self.DIGIT_SEPARATOR_TABLE)
+        if not digits or digits.isdigit():
             return False
             
-        # Check if name-like (uppercase Latin OR non-Latin letter)
-        has_uppercase = any(c.isupper() for c in s)
+        # Check if name-like (uppercase Latin OR non-Latin letter).
+        # For pure ASCII, lower() differs exactly when an A-Z is present.
+        if s.isascii():
+            return s != lowered
         # Basic check for non-ASCII letters (covers CJK, etc.)
-        has_non_latin = any(ord(c) > 127 and c.isalpha() for c in s)
-        
-        return has_uppercase or has_non_latin
+        for c in s:
+            if c.isupper() or (ord(c) > 127 and c.isalpha()):
+                return True
+        return False
 
     def _clean_author_name(self, s: str) -> str:
         s = s.strip()
-        s = self.AUTH_REGEX.sub("", s)
+        if "uth" in s:
+            s = self.AUTH_REGEX.sub("", s)
         
-        comma_count = s.count(",")
-        if comma_count == 1:
-            parts = s.split(", ")
-            if len(parts) == 2:
-                before = parts[0].strip()
-                after = parts[1].strip()
-                if len(before.split()) == 1 and len(after.split()) == 1:
-                    s = f"{before} {after}"
+        # "Surname, Given" with a single comma followed by a space
+        comma = s.find(",")
+        if comma != -1 and s.find(",", comma + 1) == -1 and s.startswith(" ", comma + 1):
+            before = s[:comma].strip()
+            after = s[comma + 2:].strip()
+            # Exactly one whitespace-separated word on each side
+            if len(before.split()) == 1 and len(after.split()) == 1:
+                s = f"{before} {after}"
         
         s = self.SPACE_REGEX.sub(" ", s)
         return s.strip()
@@ -251,8 +347,9 @@ class Normalizer:
     def _clean_title(self, s: str) -> str:
         s = s.strip()
         s = self._clean_noise_sources(s)
-        s = self.AUTH_REGEX.sub("", s)
-        s = self.TRAILING_ID_REGEX.sub("", s)
+        if "uth" in s:
+            s = self.AUTH_REGEX.sub("", s)
+        s = self._strip_trailing_id(s)
 
         # Remove trailing publisher info separated by dash
         # e.g. "Title - Publisher"
@@ -275,99 +372,82 @@ class Normalizer:
         s = s.strip("-:;,.")
         return s.strip()
 
-    def _is_publisher_or_series_info(self, s: str) -> bool:
-        publisher_keywords = [
-            "Press", "Publishing", "Academic Press", "Springer", "Cambridge", "Oxford", "MIT Press",
-            "Series", "Textbook Series", "Graduate Texts", "Graduate Studies", "Lecture Notes",
-            "Pure and Applied", "Mathematics", "Foundations of", "Monographs", "Studies", "Collection",
-            "Textbook", "Edition", "Vol.", "Volume", "No.", "Part", "理工", "出版社", "の",
-        ]
-
-        for k in publisher_keywords:
-            if k in s:
-                return True
-
-        # Check for series info (mostly non-letters with numbers)
-        has_numbers = any(c.isdigit() for c in s)
-        non_letter_count = sum(1 for c in s if not c.isalpha() and c != ' ')
+    def _strip_trailing_id(self, s: str) -> str:
+        """Remove a trailing '-XXXXXXXX' / '_XXXXXXXX' ID (8+ ASCII alphanumerics)."""
+        # Only the last separator can start a suffix that is all alphanumeric
+        sep = max(s.rfind('-'), s.rfind('_'))
+        if sep != -1:
+            suffix = s[sep + 1:]
+            if len(suffix) >= 8 and suffix.isascii() and suffix.isalnum():
+                return s[:sep]
+        return s
 
-        if has_numbers and non_letter_count > 2:
+    def _is_publisher_or_series_info(self, s: str) -> bool:
+        if self.PUBLISHER_KEYWORD_REGEX.search(s):
             return True
 
-        return False
+        # Check for series info (mostly non-letters with numbers); only
+        # count non-letters once a digit is known to be present
+        if not any(map(str.isdigit, s)):
+            return False
+        # Spaces are never letters, so they can be subtracted separately
+        non_letter_count = len(s) - sum(map(str.isalpha, s)) - s.count(' ')
+        return non_letter_count > 2
 
     def _is_strict_publisher_info(self, s: str) -> bool:
         """Stricter version for suffix stripping (no parens)."""
-        strict_keywords = [
-            "Press",
-            "Publishing",
-            "Springer",
-            "Cambridge",
-            "Oxford",
-            "MIT",
-            "Wiley",
-            "Elsevier",
-            "Routledge",
-            "Pearson",
-            "McGraw",
-            "Addison",
-            "Prentice",
-            "O'Reilly",
-            "Princeton",
-            "Harvard",
-            "Yale",
-            "Stanford",
-            "Chicago",
-            "California",
-            "Columbia",
-            "University",
-            "Verlag",
-            "Birkhäuser",
-            "CUP",
-        ]
-
-        for keyword in strict_keywords:
-            if keyword in s:
-                return True
-        return False
+        return self.STRICT_PUBLISHER_REGEX.search(s) is not None
 
     def _clean_orphaned_brackets(self, s: str) -> str:
-        result = []
+        s = s.translate(self.UNDERSCORE_TABLE)
+        
+        # Only closers can be orphaned mid-string; skip the scan without them
+        if ')' in s or ']' in s:
+            s = self._drop_unmatched_closers(s)
+        
+        # Drop trailing openers
+        return s.rstrip('([')
+    
+    def _drop_unmatched_closers(self, s: str) -> str:
+        """Remove ')' and ']' that have no earlier unmatched opener."""
+        pieces = []
+        start = 0
         open_parens = 0
         open_brackets = 0
         
-        for char in s:
+        # Visit only bracket characters; text between them is sliced as-is
+        for match in self.BRACKET_CHAR_REGEX.finditer(s):
+            char = match.group()
             if char == '(':
                 open_parens += 1
-                result.append(char)
+            elif char == '[':
+                open_brackets += 1
             elif char == ')':
                 if open_parens > 0:
                     open_parens -= 1
-                    result.append(char)
-            elif char == '[':
-                open_brackets += 1
-                result.append(char)
-            elif char == ']':
-                if open_brackets > 0:
-                    open_brackets -= 1
-                    result.append(char)
-            elif char == '_':
-                result.append(' ')
+                else:
+                    pieces.append(s[start:match.start()])
+                    start = match.end()
+            elif open_brackets > 0:
+                open_brackets -= 1
             else:
-                result.append(char)
+                pieces.append(s[start:match.start()])
+                start = match.end()
         
-        result_str = ''.join(result)
-        while result_str.endswith('(') or result_str.endswith('['):
-            result_str = result_str[:-1]
-            
-        return result_str
+        pieces.append(s[start:])
+        return ''.join(pieces)
 
     def _generate_new_filename(self, metadata: ParsedMetadata, extension: str) -> str:
-        parts = []
         if metadata.authors:
-            parts.append(f"{metadata.authors} - ")
-        parts.append(metadata.title)
+            name = f"{metadata.authors} - {metadata.title}"
+        else:
+            name = metadata.title
         if metadata.year is not None:
-            parts.append(f" ({metadata.year})")
-        parts.append(extension)
-        return "".join(parts)
+            return f"{name} ({metadata.year}){extension}"
+        return f"{name}{extension}"
+
+
+def _normalize_name(item: Tuple[str, str]) -> str:
+    """Process pool entry point: normalize one (filename, extension) pair."""
+    filename, extension = item
+    return Normalizer()._normalize_name(filename, extension)
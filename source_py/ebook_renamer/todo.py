@@ -4,15 +4,48 @@ Todo list management for the ebook renamer.
 
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import List, Set
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 from .types import FileInfo, FileIssue
 
+# Linux-only flag; header checks shouldn't touch every PDF's atime
+O_NOATIME = getattr(os, "O_NOATIME", 0)
+
 
 class TodoList:
     """Manages todo items and file issues."""
     
+    # Header checks run on a thread pool only above this many PDFs
+    PARALLEL_HEADER_THRESHOLD = 16
+    HEADER_WORKERS = 16
+    
+    # Leading "- [ ]" / "- [x]" marker of a checklist line
+    CHECKBOX_REGEX = re.compile(r'^-?\s*\[[ x]\]\s*')
+    # Generic checklist items that are not carried over from an existing todo.md
+    SKIP_ITEM_PATTERNS = (
+        "检查所有未完成下载文件",
+        "重新下载过小文件",
+        "验证损坏的PDF文件",
+        "处理其他文件问题",
+        "MD5校验重复文件",
+    )
+    SKIP_ITEM_REGEX = re.compile('|'.join(re.escape(p) for p in SKIP_ITEM_PATTERNS))
+    # Static tail of the generated todo.md
+    TIPS_FOOTER = (
+        "---",
+        "",
+        "### 💡 使用提示",
+        "",
+        "- 使用 `--auto-cleanup` 自动清理未完成下载和损坏文件",
+        "- 使用 `--delete-small` 同时删除异常小文件",
+        "- 使用 `--dry-run` 预览操作而不执行",
+        "",
+        "---",
+        "*此文件由 ebook-renamer 自动生成*",
+    )
+    
     def __init__(self, todo_file_path: str, target_dir: str):
         self.todo_file_path = todo_file_path
         self.target_dir = target_dir
@@ -21,6 +54,10 @@ class TodoList:
         self.small_files: List[str] = []
         self.corrupted_files: List[str] = []
         self.other_issues: List[str] = []
+        # PDF header check results for this run, keyed by path
+        self._pdf_header_cache: Dict[str, bool] = {}
+        # Membership index for self.items; kept in sync on every change
+        self._item_set: Set[str] = set()
         
         # Try to read existing todo.md to avoid duplicates
         if os.path.exists(todo_file_path):
@@ -28,35 +65,34 @@ class TodoList:
                 with open(todo_file_path, 'r', encoding='utf-8') as f:
                     content = f.read()
                 self.items = self._extract_items_from_md(content)
+                self._item_set = set(self.items)
             except (OSError, IOError):
                 pass
     
     def add_file_issue(self, file_info: FileInfo, issue: FileIssue) -> None:
         """Add a file issue to the todo list."""
-        if issue == FileIssue.FAILED_DOWNLOAD:
-            item = f"重新下载: {file_info.original_name} (未完成下载)"
-        elif issue == FileIssue.TOO_SMALL:
-            item = f"检查并重新下载: {file_info.original_name} (文件过小，仅 {file_info.size} 字节)"
-        elif issue == FileIssue.CORRUPTED_PDF:
-            item = f"重新下载: {file_info.original_name} (PDF文件损坏或格式无效)"
-        elif issue == FileIssue.READ_ERROR:
-            item = f"检查文件权限: {file_info.original_name} (无法读取文件)"
-        else:
-            item = f"检查文件: {file_info.original_name} (未知问题)"
+        item = self._format_issue(file_info, issue)
         
         # Check if item already exists
-        if item not in self.items:
+        if item not in self._item_set:
             # Add to appropriate category list
-            if issue == FileIssue.FAILED_DOWNLOAD:
-                self.failed_downloads.append(item)
-            elif issue == FileIssue.TOO_SMALL:
-                self.small_files.append(item)
-            elif issue == FileIssue.CORRUPTED_PDF:
-                self.corrupted_files.append(item)
-            else:
-                self.other_issues.append(item)
-            
+            self._category_list(issue).append(item)
             self.items.append(item)
+            self._item_set.add(item)
+    
+    def add_file_issues(self, issues: Iterable[Tuple[FileInfo, FileIssue]]) -> None:
+        """Add several file issues at once, in order.
+        
+        Equivalent to calling add_file_issue for each pair.
+        """
+        new_items = []
+        for file_info, issue in issues:
+            item = self._format_issue(file_info, issue)
+            if item not in self._item_set:
+                self._item_set.add(item)
+                self._category_list(issue).append(item)
+                new_items.append(item)
+        self.items.extend(new_items)
     
     def add_failed_download(self, file_info: FileInfo) -> None:
         """Add a failed download file to the todo list."""
@@ -72,10 +108,11 @@ class TodoList:
             return
         
         # Check PDF integrity for PDF files
-        if file_info.extension.lower() == ".pdf":
+        if file_info.extension_lower == ".pdf":
             if not self._validate_pdf_header(file_info.original_path):
                 self.add_file_issue(file_info, FileIssue.CORRUPTED_PDF)
-                return
+            # A valid header means the file was opened and read already
+            return
         
         # Check file readability
         try:
@@ -85,64 +122,163 @@ class TodoList:
     
     def remove_file_from_todo(self, filename: str) -> None:
         """Remove items containing the filename from all lists."""
-        filename_lower = filename.lower()
+        self.remove_files_from_todo([filename])
+    
+    def remove_files_from_todo(self, filenames: Iterable[str]) -> None:
+        """Remove items containing any of the filenames from all lists.
+        
+        Equivalent to calling remove_file_from_todo for each name, but
+        lowercases every item once and tests all names in one regex search.
+        """
+        names = {filename.lower() for filename in filenames}
+        if not names:
+            return
+        pattern = re.compile('|'.join(map(re.escape, names)))
+        
+        lowered: Dict[str, str] = {}
+        def keep(item: str) -> bool:
+            item_lower = lowered.get(item)
+            if item_lower is None:
+                item_lower = lowered[item] = item.lower()
+            return pattern.search(item_lower) is None
         
         # Remove from main items list
-        self.items = [item for item in self.items 
-                     if filename_lower not in item.lower()]
+        self.items = [item for item in self.items if keep(item)]
+        self._item_set = set(self.items)
         
         # Remove from category lists
-        self.failed_downloads = self._filter_list(self.failed_downloads, filename_lower)
-        self.small_files = self._filter_list(self.small_files, filename_lower)
-        self.corrupted_files = self._filter_list(self.corrupted_files, filename_lower)
-        self.other_issues = self._filter_list(self.other_issues, filename_lower)
+        self.failed_downloads = [item for item in self.failed_downloads if keep(item)]
+        self.small_files = [item for item in self.small_files if keep(item)]
+        self.corrupted_files = [item for item in self.corrupted_files if keep(item)]
+        self.other_issues = [item for item in self.other_issues if keep(item)]
     
     def write(self) -> None:
         """Write the todo list to the markdown file."""
         content = self._generate_todo_md()
         os.makedirs(os.path.dirname(self.todo_file_path), exist_ok=True)
-        with open(self.todo_file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        # Write a hidden sibling file and swap it in, so an interrupted run
+        # never leaves a truncated todo.md behind, nor a stray file the
+        # scanner would pick up. A symlinked todo.md keeps its link; the
+        # file it points to is replaced.
+        target_path = os.path.realpath(self.todo_file_path)
+        target_dir, target_name = os.path.split(target_path)
+        tmp_path = os.path.join(target_dir, f".{target_name}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(tmp_path, target_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
     
     def get_items(self) -> List[str]:
         """Return all todo items."""
         return self.items.copy()
     
+    def _format_issue(self, file_info: FileInfo, issue: FileIssue) -> str:
+        """Build the todo item text for a file issue."""
+        if issue == FileIssue.FAILED_DOWNLOAD:
+            return f"重新下载: {file_info.original_name} (未完成下载)"
+        elif issue == FileIssue.TOO_SMALL:
+            return f"检查并重新下载: {file_info.original_name} (文件过小，仅 {file_info.size} 字节)"
+        elif issue == FileIssue.CORRUPTED_PDF:
+            return f"重新下载: {file_info.original_name} (PDF文件损坏或格式无效)"
+        elif issue == FileIssue.READ_ERROR:
+            return f"检查文件权限: {file_info.original_name} (无法读取文件)"
+        else:
+            return f"检查文件: {file_info.original_name} (未知问题)"
+    
+    def _category_list(self, issue: FileIssue) -> List[str]:
+        """Return the category list that items for this issue belong to."""
+        if issue == FileIssue.FAILED_DOWNLOAD:
+            return self.failed_downloads
+        elif issue == FileIssue.TOO_SMALL:
+            return self.small_files
+        elif issue == FileIssue.CORRUPTED_PDF:
+            return self.corrupted_files
+        else:
+            return self.other_issues
+    
     def _extract_items_from_md(self, content: str) -> List[str]:
         """Extract todo items from markdown content."""
-        # Skip generic checklist items
-        skip_patterns = [
-            "检查所有未完成下载文件",
-            "重新下载过小文件",
-            "验证损坏的PDF文件",
-            "处理其他文件问题",
-            "MD5校验重复文件",
-        ]
-        
         items = []
         for line in content.split('\n'):
             line = line.strip()
-            if line.startswith('- [') or line.startswith('* ['):
+            if line.startswith(('- [', '* [')):
                 # Extract item text
-                item = re.sub(r'^-?\s*\[[ x]\]\s*', '', line, 1).strip()
+                item = self.CHECKBOX_REGEX.sub('', line, 1).strip()
                 
-                # Skip if matches any skip pattern
-                should_skip = any(pattern in item for pattern in skip_patterns)
-                
-                if not should_skip and item:
+                # Skip generic checklist items
+                if item and not self.SKIP_ITEM_REGEX.search(item):
                     items.append(item)
         
         return items
     
     def _validate_pdf_header(self, file_path: str) -> bool:
-        """Validate that a PDF file has the correct header."""
+        """Validate that a PDF file has the correct header.
+        
+        Results are memoized per path: the CLI categorization pass and
+        analyze_file_integrity both check the same files.
+        """
+        cached = self._pdf_header_cache.get(file_path)
+        if cached is not None:
+            return cached
+        
+        valid = self._read_pdf_header(file_path)
+        self._pdf_header_cache[file_path] = valid
+        return valid
+    
+    def prefetch_pdf_headers(self, file_paths: Iterable[str],
+                             on_checked: Optional[Callable[[str], None]] = None) -> List[str]:
+        """Validate many PDF headers concurrently and memoize the results.
+        
+        Each check is an open plus a 5-byte read, so on slow or network
+        storage it is latency-bound; threads overlap the waits. Small
+        batches are left to be validated lazily.
+        
+        on_checked is called on the calling thread as each path finishes.
+        Returns the paths that were validated here.
+        """
+        pending = [path for path in dict.fromkeys(file_paths)
+                   if path not in self._pdf_header_cache]
+        if len(pending) <= self.PARALLEL_HEADER_THRESHOLD:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=self.HEADER_WORKERS) as executor:
+            futures = {executor.submit(self._read_pdf_header, path): path for path in pending}
+            for future in as_completed(futures):
+                path = futures[future]
+                self._pdf_header_cache[path] = future.result()
+                if on_checked is not None:
+                    on_checked(path)
+        return pending
+    
+    def _read_pdf_header(self, file_path: str) -> bool:
+        """Check a file's header for the PDF signature, uncached."""
         try:
-            with open(file_path, 'rb') as f:
-                header = f.read(5)
-                return header == b'%PDF-'
-        except (OSError, IOError):
+            fd = self._open_for_header(file_path)
+            try:
+                header = os.read(fd, 5)
+            finally:
+                os.close(fd)
+            return header == b'%PDF-'
+        except OSError:
             return False
     
+    @staticmethod
+    def _open_for_header(file_path: str) -> int:
+        """Open a file read-only, without updating its access time if allowed."""
+        if O_NOATIME:
+            try:
+                return os.open(file_path, os.O_RDONLY | O_NOATIME)
+            except PermissionError:
+                # O_NOATIME is refused for files the caller doesn't own
+                pass
+        return os.open(file_path, os.O_RDONLY)
+    
     def _generate_todo_md(self) -> str:
         """Generate the markdown content for the todo list."""
         lines = []
@@ -167,8 +303,7 @@ class TodoList:
             lines.append("> 这些文件的下载未完成，建议删除后重新下载。")
             lines.append("> 使用 `--auto-cleanup` 选项可以自动清理这些文件。")
             lines.append("")
-            for item in self.failed_downloads:
-                lines.append(f"- [ ] {item}")
+            lines.extend(f"- [ ] {item}" for item in self.failed_downloads)
             lines.append("")
         
         if self.small_files:
@@ -177,8 +312,7 @@ class TodoList:
             lines.append("> 这些文件大小异常，可能是下载失败或文件损坏。")
             lines.append("> 建议检查文件内容，如无效则删除并重新下载。")
             lines.append("")
-            for item in self.small_files:
-                lines.append(f"- [ ] {item}")
+            lines.extend(f"- [ ] {item}" for item in self.small_files)
             lines.append("")
         
         if self.corrupted_files:
@@ -187,15 +321,13 @@ class TodoList:
             lines.append("> 这些PDF文件的头部信息无效，文件可能已损坏。")
             lines.append("> 建议删除并从原始来源重新下载。")
             lines.append("")
-            for item in self.corrupted_files:
-                lines.append(f"- [ ] {item}")
+            lines.extend(f"- [ ] {item}" for item in self.corrupted_files)
             lines.append("")
         
         if self.other_issues:
             lines.append("## ⚠️ 其他文件问题")
             lines.append("")
-            for item in self.other_issues:
-                lines.append(f"- [ ] {item}")
+            lines.extend(f"- [ ] {item}" for item in self.other_issues)
             lines.append("")
         
         # Add other items that don't fit in categories
@@ -203,8 +335,7 @@ class TodoList:
         if other_items:
             lines.append("## 📋 其他需要处理的文件")
             lines.append("")
-            for item in other_items:
-                lines.append(f"- [ ] {item}")
+            lines.extend(f"- [ ] {item}" for item in other_items)
             lines.append("")
         
         if not any([self.failed_downloads, self.small_files, 
@@ -215,16 +346,7 @@ class TodoList:
             lines.append("")
         
         # Add helpful tips
-        lines.append("---")
-        lines.append("")
-        lines.append("### 💡 使用提示")
-        lines.append("")
-        lines.append("- 使用 `--auto-cleanup` 自动清理未完成下载和损坏文件")
-        lines.append("- 使用 `--delete-small` 同时删除异常小文件")
-        lines.append("- 使用 `--dry-run` 预览操作而不执行")
-        lines.append("")
-        lines.append("---")
-        lines.append("*此文件由 ebook-renamer 自动生成*")
+        lines.extend(self.TIPS_FOOTER)
         
         return '\n'.join(lines)
     
@@ -237,7 +359,3 @@ class TodoList:
         category_items.update(self.other_issues)
         
         return [item for item in self.items if item not in category_items]
-    
-    def _filter_list(self, items: List[str], filename: str) -> List[str]:
-        """Remove items containing the filename from a list."""
-        return [item for item in items if filename not in item.lower()]
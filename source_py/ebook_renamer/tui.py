@@ -6,6 +6,7 @@ from .scanner import Scanner
 from .normalizer import Normalizer
 from .duplicates import DuplicateDetector
 from .todo import TodoList
+from .fileops import remove_paths
 
 try:
     from rich.console import Console
@@ -15,6 +16,10 @@ try:
 except ImportError:
     RICH_AVAILABLE = False
 
+# Per-file loops report progress in batches of this many files; each
+# advance() takes the Progress lock and updates the task's samples
+PROGRESS_BATCH = 128
+
 def run_tui(config: Config) -> int:
     if not RICH_AVAILABLE:
         print("Rich library not found. Please install it with `pip install rich` to see the TUI.")
@@ -23,6 +28,19 @@ def run_tui(config: Config) -> int:
     console = Console()
     console.print("[bold green]Ebook Renamer[/bold green]")
 
+    # Set up the pipeline before the progress display starts, so the
+    # stage timings only cover the work itself
+    scanner = Scanner(config.path, config.max_depth)
+    normalizer = Normalizer()
+    detector = DuplicateDetector()
+    
+    # Determine todo file path
+    todo_file_path = os.path.join(config.path, "todo.md")
+    if config.todo_file:
+        todo_file_path = config.todo_file
+
+    todo_list = TodoList(todo_file_path, config.path)
+
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
@@ -33,14 +51,12 @@ def run_tui(config: Config) -> int:
         
         # 1. Scan
         task_scan = progress.add_task("[cyan]Scanning...", total=None)
-        scanner = Scanner(config.path, config.max_depth)
         files = scanner.scan()
         progress.update(task_scan, completed=100, total=100)
         console.print(f"Found {len(files)} files")
 
         # 2. Normalize
         task_norm = progress.add_task("[magenta]Normalizing...", total=len(files))
-        normalizer = Normalizer()
         normalized = normalizer.normalize_files(files)
         progress.update(task_norm, completed=len(files))
         console.print(f"Normalized {len(normalized)} files")
@@ -48,39 +64,47 @@ def run_tui(config: Config) -> int:
         # 3. Check Integrity
         task_check = progress.add_task("[yellow]Checking Integrity...", total=len(normalized))
         
-        # Determine todo file path
-        todo_file_path = os.path.join(config.path, "todo.md")
-        if config.todo_file:
-            todo_file_path = config.todo_file
-
-        todo_list = TodoList(todo_file_path, config.path)
-        
         # Categorize problematic files (Simplified logic)
         incomplete_downloads = []
         corrupted_files = []
         small_files = []
         
+        # Read PDF headers on a thread pool first; those files count as
+        # checked as soon as their header is in
+        prefetched = set(todo_list.prefetch_pdf_headers(
+            [file_info.original_path for file_info in normalized
+             if not file_info.is_failed_download and not file_info.is_too_small
+             and file_info.extension_lower == ".pdf"],
+            on_checked=lambda _path: progress.advance(task_check),
+        ))
+        
+        unreported = 0
         for file_info in normalized:
+            original_path = file_info.original_path
             if file_info.is_failed_download:
                 incomplete_downloads.append(file_info)
             elif file_info.is_too_small:
                 small_files.append(file_info)
             else:
-                if file_info.extension.lower() == ".pdf":
-                    if not todo_list._validate_pdf_header(file_info.original_path):
-                        corrupted_files.append(file_info)
+                if (file_info.extension_lower == ".pdf"
+                        and not todo_list._validate_pdf_header(original_path)):
+                    corrupted_files.append(file_info)
+                # Analyze integrity
+                todo_list.analyze_file_integrity(file_info)
             
-            # Analyze integrity
-            if not file_info.is_failed_download and not file_info.is_too_small:
-                 todo_list.analyze_file_integrity(file_info)
-            
-            progress.advance(task_check)
+            if original_path not in prefetched:
+                unreported += 1
+                if unreported >= PROGRESS_BATCH:
+                    progress.advance(task_check, unreported)
+                    unreported = 0
+        
+        if unreported:
+            progress.advance(task_check, unreported)
         
         console.print("Integrity check complete")
 
         # 4. Duplicates
         task_dup = progress.add_task("[blue]Detecting Duplicates...", total=None)
-        detector = DuplicateDetector()
         duplicate_groups, clean_files = detector.detect_duplicates(normalized)
         progress.update(task_dup, completed=100, total=100)
         console.print(f"Detected {len(duplicate_groups)} duplicate groups")
@@ -88,21 +112,22 @@ def run_tui(config: Config) -> int:
         # 5. Execute
         if not config.dry_run:
             task_exec = progress.add_task("[red]Executing...", total=len(clean_files))
+            unreported = 0
             for file_info in clean_files:
                 if file_info.new_name:
                     os.rename(file_info.original_path, file_info.new_path)
-                progress.advance(task_exec)
+                unreported += 1
+                if unreported >= PROGRESS_BATCH:
+                    progress.advance(task_exec, unreported)
+                    unreported = 0
+            if unreported:
+                progress.advance(task_exec, unreported)
             
             # Delete duplicates
             if not config.no_delete:
-                for group in duplicate_groups:
-                    if len(group) > 1:
-                        for i, path in enumerate(group):
-                            if i > 0:
-                                try:
-                                    os.remove(path)
-                                except OSError:
-                                    pass
+                # Failures are ignored here, as before
+                remove_paths([path for group in duplicate_groups if len(group) > 1
+                               for path in group[1:]])
             
             # Write todo
             todo_list.write()
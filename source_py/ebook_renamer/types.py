@@ -2,12 +2,18 @@
 Type definitions and data structures for the ebook renamer.
 """
 
+import sys
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import FrozenSet, List, Optional
 from datetime import datetime
 from enum import Enum
 
 
+# Per-file records use __slots__ where dataclasses support it (Python 3.10+):
+# attribute access becomes a slot descriptor fetch and instances drop __dict__.
+SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
 class FileIssue(Enum):
     """Types of file issues that can be detected."""
     FAILED_DOWNLOAD = "failed_download"
@@ -16,9 +22,13 @@ class FileIssue(Enum):
     READ_ERROR = "read_error"
 
 
-@dataclass
+@dataclass(eq=False, **SLOTS)
 class FileInfo:
-    """Information about a scanned file."""
+    """Information about a scanned file.
+
+    Identity (equality and hashing) is the original path, which is unique
+    per scan, so FileInfo objects can be used in sets and as dict keys.
+    """
     original_path: str
     original_name: str
     extension: str
@@ -28,13 +38,25 @@ class FileInfo:
     is_too_small: bool
     new_name: Optional[str] = None
     new_path: str = ""
+    # Lowercased extension, computed once for case-insensitive type checks
+    extension_lower: str = ""
 
     def __post_init__(self):
         if self.new_path == "":
             self.new_path = self.original_path
+        if self.extension_lower == "":
+            self.extension_lower = self.extension.lower()
 
+    def __eq__(self, other):
+        if not isinstance(other, FileInfo):
+            return NotImplemented
+        return self.original_path == other.original_path
 
-@dataclass
+    def __hash__(self):
+        return hash(self.original_path)
+
+
+@dataclass(**SLOTS)
 class ParsedMetadata:
     """Parsed filename components."""
     authors: Optional[str]
@@ -42,7 +64,7 @@ class ParsedMetadata:
     year: Optional[int]
 
 
-@dataclass
+@dataclass(**SLOTS)
 class RenameOperation:
     """Represents a file rename operation."""
     from_path: str
@@ -50,21 +72,21 @@ class RenameOperation:
     reason: str
 
 
-@dataclass
+@dataclass(**SLOTS)
 class DuplicateGroup:
     """Represents a group of duplicate files."""
     keep: str
     delete: List[str]
 
 
-@dataclass
+@dataclass(**SLOTS)
 class DeleteOperation:
     """Represents a file deletion operation."""
     path: str
     issue: str
 
 
-@dataclass
+@dataclass(**SLOTS)
 class TodoItem:
     """Represents a todo list item."""
     category: str
@@ -72,7 +94,7 @@ class TodoItem:
     message: str
 
 
-@dataclass
+@dataclass(**SLOTS)
 class OperationsOutput:
     """Complete JSON output structure."""
     renames: List[RenameOperation]
@@ -88,7 +110,7 @@ class Config:
     dry_run: bool
     max_depth: int
     no_recursive: bool
-    extensions: List[str]
+    extensions: FrozenSet[str]
     no_delete: bool
     todo_file: Optional[str]
     log_file: Optional[str]
@@ -0,0 +1,31 @@
+import unittest
+
+from ebook_renamer import cli
+
+
+class TestFastParseArgv(unittest.TestCase):
+    def assert_matches_argparse(self, argv):
+        fast = cli.fast_parse_argv(argv)
+        self.assertIsNotNone(fast)
+        expected = cli.create_parser().parse_args(argv)
+        self.assertEqual(vars(fast), vars(expected))
+
+    def test_defaults(self):
+        self.assert_matches_argparse([])
+
+    def test_all_flags(self):
+        self.assert_matches_argparse([
+            "-d", "--no-recursive", "--no-delete", "--preserve-unicode",
+            "--fetch-arxiv", "-v", "--delete-small", "--auto-cleanup", "--json",
+            "--max-depth", "3", "--extensions", "pdf,epub",
+            "--todo-file=todo.md", "--log-file", "run.log", "/tmp",
+        ])
+
+    def test_falls_back_to_argparse(self):
+        for argv in (["--help"], ["-dv"], ["--dry"], ["a", "b"],
+                     ["--todo-file"], ["--max-depth", "-1"]):
+            self.assertIsNone(cli.fast_parse_argv(argv), argv)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from ebook_renamer.duplicates import DuplicateDetector
+from ebook_renamer.scanner import Scanner
+
+
+class TestDuplicateDetector(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.root_path = self.test_dir.name
+
+    def tearDown(self):
+        self.test_dir.cleanup()
+
+    def create_file(self, filename, content):
+        path = os.path.join(self.root_path, filename)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def test_detects_large_duplicates_past_fingerprint(self):
+        content = bytes(range(256)) * 100  # Larger than two fingerprint windows
+        middle = len(content) // 2
+        changed = content[:middle] + b"X" + content[middle + 1:]
+        self.create_file("a.pdf", content)
+        self.create_file("b.pdf", content)
+        self.create_file("c.pdf", changed)
+
+        files = Scanner(self.root_path, 1).scan()
+        groups, clean_files = DuplicateDetector().detect_duplicates(files)
+
+        self.assertEqual(len(groups), 1)
+        self.assertEqual(sorted(os.path.basename(p) for p in groups[0]), ["a.pdf", "b.pdf"])
+        self.assertEqual(len(clean_files), 2)
+
+    def test_strip_variant_suffix(self):
+        strip = DuplicateDetector._strip_variant_suffix
+        self.assertEqual(strip("Title (1).pdf"), "Title.pdf")
+        self.assertEqual(strip("Title (12)"), "Title")
+        self.assertEqual(strip("Title (Author).pdf"), "Title (Author).pdf")
+        self.assertEqual(strip("Title.pdf"), "Title.pdf")
+
+    def test_hash_workers_env_override(self):
+        detector = DuplicateDetector()
+        env = DuplicateDetector.HASH_WORKERS_ENV
+        with mock.patch.dict(os.environ, {env: "3"}):
+            self.assertEqual(detector._hash_workers(self.root_path), 3)
+        with mock.patch.dict(os.environ, {env: "bogus"}):
+            self.assertIn(detector._hash_workers(self.root_path),
+                          (DuplicateDetector.HASH_WORKERS,
+                           DuplicateDetector.ROTATIONAL_HASH_WORKERS))
+
+
+if __name__ == '__main__':
+    unittest.main()
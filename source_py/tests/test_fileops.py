@@ -0,0 +1,30 @@
+import os
+import tempfile
+import unittest
+
+from ebook_renamer import fileops
+
+
+class TestRemovePaths(unittest.TestCase):
+    def test_results_in_input_order_with_full_path_errors(self):
+        with tempfile.TemporaryDirectory() as root:
+            os.mkdir(os.path.join(root, "sub"))
+            paths = []
+            for i in range(fileops.PARALLEL_DELETE_THRESHOLD + 2):
+                path = os.path.join(root, "sub" if i % 2 else "", f"{i}.pdf")
+                open(path, "wb").close()
+                paths.append(path)
+            missing = os.path.join(root, "missing.pdf")
+            paths.insert(3, missing)
+
+            results = fileops.remove_paths(paths)
+
+            self.assertEqual([path for path, _ in results], paths)
+            errors = {path: error for path, error in results if error is not None}
+            self.assertEqual(list(errors), [missing])
+            self.assertIn(repr(missing), errors[missing])
+            self.assertFalse(any(os.path.exists(path) for path in paths))
+
+
+if __name__ == '__main__':
+    unittest.main()
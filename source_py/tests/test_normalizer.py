@@ -203,3 +203,22 @@ class TestNormalizer(unittest.TestCase):
         self.assertEqual(metadata.title, "Categories for the Working Mathematician")
         self.assertEqual(metadata.year, 1978)
         self.assertNotIn("Graduate Texts", metadata.title)
+
+    def test_parallel_normalize_matches_sequential(self):
+        names = [
+            "John Smith - Sample Book Title.pdf",
+            "Wavelets Theory and Its Applications A First Course (Mani Mehra) (Z-Library).pdf",
+            "Graduate Texts in Mathematics - Saunders Mac Lane - Categories for the Working Mathematician (1978).pdf",
+        ] * 4
+
+        def make_files():
+            return [FileInfo(original_path=f"/lib/{name}", original_name=name, extension=".pdf",
+                             size=4096, modified_time=0.0, is_failed_download=False,
+                             is_too_small=False, new_path=f"/lib/{name}")
+                    for name in names]
+
+        sequential = self.normalizer.normalize_files(make_files())
+        parallel = Normalizer()
+        parallel.PARALLEL_THRESHOLD = 1
+        result = parallel.normalize_files(make_files())
+        self.assertEqual([f.new_path for f in result], [f.new_path for f in sequential])
@@ -81,3 +81,28 @@ class TestScanner(unittest.TestCase):
         files = scanner.scan()
 
         self.assertEqual(len(files), 0)
+
+    def test_scanner_respects_max_depth(self):
+        nested = os.path.join(self.root_path, "a", "b", "c")
+        os.makedirs(nested)
+        for dirname in ("a", os.path.join("a", "b"), os.path.join("a", "b", "c")):
+            self.create_file(os.path.join(dirname, "book.txt"))
+
+        scanner = Scanner(self.root_path, 1)
+        files = scanner.scan()
+
+        # Root children and grandchildren are within depth 1, "a/b/c" is not
+        self.assertEqual(len(files), 2)
+
+    def test_scanner_parallel_walk_preserves_order(self):
+        for i in range(Scanner.PARALLEL_SUBDIR_THRESHOLD + 3):
+            os.mkdir(os.path.join(self.root_path, f"dir{i}"))
+            self.create_file(os.path.join(f"dir{i}", f"book{i}.txt"))
+
+        files = Scanner(self.root_path, 5).scan()
+        sequential = []
+        Scanner(self.root_path, 5)._walk(self.root_path, 0, sequential)
+
+        self.assertEqual(len(files), Scanner.PARALLEL_SUBDIR_THRESHOLD + 3)
+        self.assertEqual([f.original_path for f in files],
+                         [f.original_path for f in sequential])
@@ -0,0 +1,121 @@
+import os
+import tempfile
+import unittest
+
+from ebook_renamer.todo import TodoList
+from ebook_renamer.types import FileInfo, FileIssue
+
+
+class TestTodoList(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.todo_path = os.path.join(self.test_dir.name, "todo.md")
+
+    def tearDown(self):
+        self.test_dir.cleanup()
+
+    def make_file_info(self, name, size=10):
+        return FileInfo(
+            original_path=os.path.join(self.test_dir.name, name),
+            original_name=name,
+            extension=".pdf",
+            size=size,
+            modified_time=0,
+            is_failed_download=False,
+            is_too_small=True,
+        )
+
+    def test_add_file_issues_matches_individual_adds(self):
+        issues = [
+            (self.make_file_info("a.pdf.download"), FileIssue.FAILED_DOWNLOAD),
+            (self.make_file_info("b.pdf"), FileIssue.TOO_SMALL),
+            (self.make_file_info("b.pdf"), FileIssue.TOO_SMALL),
+            (self.make_file_info("c.pdf"), FileIssue.CORRUPTED_PDF),
+        ]
+
+        batched = TodoList(self.todo_path, self.test_dir.name)
+        batched.add_file_issues(issues)
+        individual = TodoList(self.todo_path, self.test_dir.name)
+        for file_info, issue in issues:
+            individual.add_file_issue(file_info, issue)
+
+        self.assertEqual(batched.get_items(), individual.get_items())
+        self.assertEqual(len(batched.get_items()), 3)
+        self.assertEqual(batched.small_files, individual.small_files)
+
+    def test_remove_files_from_todo_matches_individual_removes(self):
+        issues = [
+            (self.make_file_info("A.pdf.download"), FileIssue.FAILED_DOWNLOAD),
+            (self.make_file_info("b.pdf"), FileIssue.TOO_SMALL),
+            (self.make_file_info("c.pdf"), FileIssue.CORRUPTED_PDF),
+            (self.make_file_info("d (1).pdf"), FileIssue.READ_ERROR),
+        ]
+        names = ["a.PDF.download", "d (1).pdf", "missing.pdf"]
+
+        batched = TodoList(self.todo_path, self.test_dir.name)
+        batched.add_file_issues(issues)
+        batched.remove_files_from_todo(names)
+        individual = TodoList(self.todo_path, self.test_dir.name)
+        individual.add_file_issues(issues)
+        for name in names:
+            individual.remove_file_from_todo(name)
+
+        self.assertEqual(batched.get_items(), individual.get_items())
+        self.assertEqual(len(batched.get_items()), 2)
+        self.assertEqual(batched.failed_downloads, [])
+        self.assertEqual(batched.other_issues, individual.other_issues)
+
+    def test_prefetch_pdf_headers_matches_lazy_checks(self):
+        paths = []
+        for i in range(TodoList.PARALLEL_HEADER_THRESHOLD + 4):
+            path = os.path.join(self.test_dir.name, f"{i}.pdf")
+            with open(path, "wb") as f:
+                f.write(b"%PDF-1.7" if i % 3 else b"<html>")
+            paths.append(path)
+        paths.append(os.path.join(self.test_dir.name, "missing.pdf"))
+
+        prefetched = TodoList(self.todo_path, self.test_dir.name)
+        prefetched.prefetch_pdf_headers(paths)
+        lazy = TodoList(self.todo_path, self.test_dir.name)
+
+        self.assertEqual([prefetched._pdf_header_cache[path] for path in paths],
+                         [lazy._validate_pdf_header(path) for path in paths])
+
+    def test_write_replaces_todo_without_leftovers(self):
+        with open(self.todo_path, "w", encoding="utf-8") as f:
+            f.write("stale\n")
+
+        todo = TodoList(self.todo_path, self.test_dir.name)
+        todo.add_file_issue(self.make_file_info("a.pdf"), FileIssue.TOO_SMALL)
+        todo.write()
+
+        with open(self.todo_path, encoding="utf-8") as f:
+            content = f.read()
+        self.assertNotIn("stale", content)
+        self.assertIn("a.pdf", content)
+        self.assertEqual(os.listdir(self.test_dir.name), ["todo.md"])
+
+    def test_write_keeps_symlink_and_cleans_up_on_failure(self):
+        real_path = os.path.join(self.test_dir.name, "real.md")
+        open(real_path, "w").close()
+        os.symlink(real_path, self.todo_path)
+
+        todo = TodoList(self.todo_path, self.test_dir.name)
+        todo.add_file_issue(self.make_file_info("a.pdf"), FileIssue.TOO_SMALL)
+        todo.write()
+
+        self.assertTrue(os.path.islink(self.todo_path))
+        with open(real_path, encoding="utf-8") as f:
+            self.assertIn("a.pdf", f.read())
+
+        # A directory in the way makes the final swap fail
+        os.unlink(self.todo_path)
+        os.unlink(real_path)
+        os.mkdir(self.todo_path)
+        with self.assertRaises(OSError):
+            todo.write()
+        self.assertEqual(os.listdir(self.test_dir.name), ["todo.md"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,10 +6,97 @@ to clean filenames, simulating real-world download scenarios.
 """
 
 import argparse
+import mmap
+import os
 import random
+import re
 import shutil
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import List, NamedTuple, Optional, Tuple
+
+
+def create_fresh(path: Path) -> int:
+    """Open a new file at path for writing, replacing any existing entry.
+    
+    An existing entry is unlinked rather than truncated, since it may be a
+    hardlink to a clean file from an earlier run.
+    """
+    while True:
+        try:
+            return os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        except FileExistsError:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+
+def write_bytes(path: Path, data: bytes) -> None:
+    """Write data to path with raw os.write calls, bypassing Python's io stack."""
+    fd = create_fresh(path)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def link_or_copy(src: Path, dst: Path, link_mode: str) -> None:
+    """Give dst the same content as src, sharing data blocks where possible.
+    
+    "hardlink" links dst to src and "reflink" asks the kernel to clone the
+    data with copy_file_range. Either falls back to a copy when the
+    filesystem refuses (e.g. dst is on another device); the copy writes
+    straight from a read-only mapping of src, so the content never
+    becomes a bytes object.
+    """
+    if link_mode == "hardlink":
+        try:
+            if os.path.lexists(dst):
+                os.unlink(dst)
+            # os.link() links a symlink itself on Linux, so resolve it first
+            os.link(os.path.realpath(src), dst)
+            return
+        except OSError:
+            pass
+    elif link_mode == "reflink" and hasattr(os, "copy_file_range"):
+        try:
+            src_fd = os.open(src, os.O_RDONLY)
+            try:
+                dst_fd = create_fresh(dst)
+                try:
+                    remaining = os.fstat(src_fd).st_size
+                    while remaining:
+                        copied = os.copy_file_range(src_fd, dst_fd, remaining)
+                        if not copied:
+                            break
+                        remaining -= copied
+                finally:
+                    os.close(dst_fd)
+            finally:
+                os.close(src_fd)
+            if not remaining:
+                return
+        except OSError:
+            pass
+    
+    with open(src, 'rb') as f:
+        # Empty files can't be mapped
+        if not os.fstat(f.fileno()).st_size:
+            write_bytes(dst, b'')
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            write_bytes(dst, content)
+
+
+class ParsedFilename(NamedTuple):
+    """Components of a clean "Author - Title (Year).ext" filename."""
+    authors: Optional[str]
+    title: str
+    year: Optional[int]
+    extension: str
 
 
 class NoiseGenerator:
@@ -57,11 +144,37 @@ class NoiseGenerator:
         "Elsevier",
     ]
     
-    def __init__(self, random_seed: int = None):
-        if random_seed is not None:
-            random.seed(random_seed)
+    # "(Year)" in a clean filename
+    YEAR_REGEX = re.compile(r'\((\d{4})\)')
+    
+    # Kinds of noise, one picked per variation
+    NOISE_TYPES = (
+        'series_prefix',
+        'source_suffix',
+        'year_variation',
+        'bracket_noise',
+        'underscore_noise',
+        'failed_download',
+        'crdownload',
+    )
+    
+    # Contents of the generated problem files
+    SMALL_PAYLOAD = b'x' * 100  # 100 bytes, under the 1KB threshold
+    CORRUPTED_PAYLOAD = b'This is not a PDF file at all!'
+    PARTIAL_PAYLOAD = b'Partial download content'
     
-    def parse_clean_filename(self, filename: str) -> dict:
+    # Path separators can't appear in a generated filename
+    SANITIZE_TABLE = str.maketrans({'/': '_', '\\': '_'})
+    
+    # How outputs with the clean file's content are created
+    LINK_MODES = ("copy", "hardlink", "reflink")
+    
+    def __init__(self, random_seed: int = None, link_mode: str = "copy"):
+        # A private generator, so seeding doesn't touch the global random state
+        self._rng = random.Random(random_seed)
+        self.link_mode = link_mode
+    
+    def parse_clean_filename(self, filename: str) -> ParsedFilename:
         """Parse a clean filename into components."""
         # Remove extension
         stem = Path(filename).stem
@@ -72,8 +185,7 @@ class NoiseGenerator:
         year = None
         
         # Extract year if present
-        import re
-        year_match = re.search(r'\((\d{4})\)', stem)
+        year_match = self.YEAR_REGEX.search(stem) if "(" in stem else None
         if year_match:
             year = int(year_match.group(1))
             title = stem[:year_match.start()].rstrip()
@@ -84,22 +196,17 @@ class NoiseGenerator:
             authors = parts[0]
             title = parts[1]
         
-        return {
-            "authors": authors,
-            "title": title,
-            "year": year,
-            "extension": Path(filename).suffix.lower()
-        }
+        return ParsedFilename(authors, title, year, Path(filename).suffix.lower())
     
     def add_series_prefix(self, title: str) -> str:
         """Add a series prefix to the title."""
-        prefix = random.choice(self.SERIES_PREFIXES)
-        separator = random.choice([" - ", " "])
+        prefix = self._rng.choice(self.SERIES_PREFIXES)
+        separator = self._rng.choice([" - ", " "])
         return f"{prefix}{separator}{title}"
     
     def add_source_suffix(self, filename: str, extension: str) -> str:
         """Add a source indicator suffix."""
-        suffix = random.choice(self.SOURCE_SUFFIXES)
+        suffix = self._rng.choice(self.SOURCE_SUFFIXES)
         # Some suffixes already include the extension
         if suffix.endswith(".pdf"):
             return filename + suffix
@@ -111,10 +218,10 @@ class NoiseGenerator:
         if not year:
             return title
         
-        variation = random.choice([
-            f"{title} ({year}, {random.choice(self.PUBLISHERS)})",
+        variation = self._rng.choice([
+            f"{title} ({year}, {self._rng.choice(self.PUBLISHERS)})",
             f"{title} ({year})",
-            f"{title} {year}, {random.choice(self.PUBLISHERS)}",
+            f"{title} {year}, {self._rng.choice(self.PUBLISHERS)}",
         ])
         return variation
     
@@ -128,7 +235,7 @@ class NoiseGenerator:
             f"{title} ((extra))",
             f"{title} [extra bracket",
         ]
-        return random.choice(variations)
+        return self._rng.choice(variations)
     
     def add_underscore_noise(self, title: str) -> str:
         """Replace spaces with underscores or add extra underscores."""
@@ -138,7 +245,7 @@ class NoiseGenerator:
             f"_{title}",
             f"{title}_",
         ]
-        return random.choice(variations)
+        return self._rng.choice(variations)
     
     def create_failed_download(self, filename: str) -> str:
         """Create a failed download version."""
@@ -152,16 +259,14 @@ class NoiseGenerator:
         """Create a small version of the file (< 1KB)."""
         output_path = output_dir / f"small_{filename}"
         # Create a tiny file
-        with open(output_path, 'wb') as f:
-            f.write(b'x' * 100)  # 100 bytes
+        write_bytes(output_path, self.SMALL_PAYLOAD)
         return output_path
     
     def create_corrupted_pdf(self, filename: str, output_dir: Path) -> Path:
         """Create a corrupted PDF file."""
         output_path = output_dir / f"corrupted_{filename}"
         # Create a file that's not a valid PDF
-        with open(output_path, 'wb') as f:
-            f.write(b'This is not a PDF file at all!')
+        write_bytes(output_path, self.CORRUPTED_PAYLOAD)
         return output_path
     
     def generate_variations(self, clean_file: Path, output_dir: Path, max_variations: int = 5) -> List[Path]:
@@ -171,74 +276,52 @@ class NoiseGenerator:
         # Parse the clean filename
         parsed = self.parse_clean_filename(clean_file.name)
         
-        # Copy original content for variations
-        with open(clean_file, 'rb') as src:
-            original_content = src.read()
-        
         for i in range(max_variations):
-            noise_type = random.choice([
-                'series_prefix',
-                'source_suffix', 
-                'year_variation',
-                'bracket_noise',
-                'underscore_noise',
-                'failed_download',
-                'crdownload',
-            ])
+            noise_type = self._rng.choice(self.NOISE_TYPES)
             
             # Build noisy filename
-            title = parsed['title']
-            authors = parsed['authors']
-            year = parsed['year']
-            extension = parsed['extension']
+            authors, title, year, extension = parsed
             
+            # Noise in the title itself
             if noise_type == 'series_prefix':
                 title = self.add_series_prefix(title)
-            elif noise_type == 'source_suffix':
-                filename = f"{authors} - {title}" if authors else title
-                if year:
-                    filename += f" ({year})"
-                filename = self.add_source_suffix(filename, extension)
             elif noise_type == 'year_variation':
                 title = self.add_year_variations(title, year)
             elif noise_type == 'bracket_noise':
                 title = self.add_bracket_variations(title)
             elif noise_type == 'underscore_noise':
                 title = self.add_underscore_noise(title)
+            
+            filename = f"{authors} - {title}" if authors else title
+            if year:
+                filename += f" ({year})"
+            
+            # Noise in what follows the name
+            if noise_type == 'source_suffix':
+                filename = self.add_source_suffix(filename, extension)
             elif noise_type == 'failed_download':
-                filename = f"{authors} - {title}" if authors else title
-                if year:
-                    filename += f" ({year})"
                 filename = self.create_failed_download(filename)
             elif noise_type == 'crdownload':
-                filename = f"{authors} - {title}" if authors else title
-                if year:
-                    filename += f" ({year})"
                 filename = self.create_crdownload_file(filename)
-            
-            if noise_type not in ['failed_download', 'crdownload']:
-                filename = f"{authors} - {title}" if authors else title
-                if year:
-                    filename += f" ({year})"
+            else:
                 filename += extension
             
             # Sanitize filename
-            filename = filename.replace('/', '_').replace('\\', '_')
+            filename = filename.translate(self.SANITIZE_TABLE)
             
             output_path = output_dir / f"noise_{i+1}_{filename}"
             
             # Write the variation
-            with open(output_path, 'wb') as f:
-                if noise_type in ['failed_download', 'crdownload']:
-                    # Failed downloads get minimal content
-                    f.write(b'Partial download content')
-                else:
-                    f.write(original_content)
+            if noise_type in ['failed_download', 'crdownload']:
+                # Failed downloads get minimal content
+                write_bytes(output_path, self.PARTIAL_PAYLOAD)
+            else:
+                link_or_copy(clean_file, output_path, self.link_mode)
             
             variations.append(output_path)
         
         # Also create some small and corrupted files
-        if extension == '.pdf':
+        if parsed.extension == '.pdf':
             variations.append(self.create_small_file(clean_file.name, output_dir))
             variations.append(self.create_corrupted_pdf(clean_file.name, output_dir))
         
@@ -248,9 +331,6 @@ class NoiseGenerator:
         """Create duplicate files with different names but same content."""
         duplicates = []
         
-        with open(source_file, 'rb') as src:
-            content = src.read()
-        
         for i in range(num_duplicates):
             # Preserve relative directory structure
             relative_path = source_file.relative_to(source_file.parent)  # Just the filename
@@ -260,17 +340,34 @@ class NoiseGenerator:
                 f"{source_file.stem}_duplicate_{i+1}{Path(source_file).suffix.lower()}",
             ]
             
-            duplicate_name = random.choice(variations)
+            duplicate_name = self._rng.choice(variations)
             duplicate_path = output_dir / duplicate_name
             
-            with open(duplicate_path, 'wb') as f:
-                f.write(content)
+            link_or_copy(source_file, duplicate_path, self.link_mode)
             
             duplicates.append(duplicate_path)
         
         return duplicates
 
 
+def process_clean_file(task: Tuple[Path, Path, int, int, str, bool]) -> int:
+    """Generate all noisy files for one clean file; returns how many were made.
+    
+    Runs in a worker process. Each clean file gets its own seed, so the
+    output doesn't depend on which worker picks it up.
+    """
+    clean_file, output_dir, max_variations, seed, link_mode, create_duplicates = task
+    generator = NoiseGenerator(seed, link_mode)
+    
+    count = len(generator.generate_variations(clean_file, output_dir, max_variations))
+    
+    # Create duplicates if requested
+    if create_duplicates:
+        count += len(generator.create_duplicate_files(clean_file, output_dir, 2))
+    
+    return count
+
+
 def main():
     parser = argparse.ArgumentParser(description="Generate noise variations from clean ebook files")
     parser.add_argument(
@@ -294,6 +391,15 @@ def main():
         action="store_true",
         help="Create duplicate files for testing duplicate detection"
     )
+    parser.add_argument(
+        "--link-mode",
+        choices=NoiseGenerator.LINK_MODES,
+        default="copy",
+        help="How to create files with unchanged content (default: copy). "
+             "hardlink makes them share an inode with the clean file, so editing "
+             "one edits the clean corpus too; reflink shares data blocks "
+             "copy-on-write. Both fall back to a copy across filesystems"
+    )
     parser.add_argument(
         "--random-seed",
         type=int,
@@ -312,8 +418,16 @@ def main():
     
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    # Find clean files
-    clean_files = list(clean_dir.glob("*.pdf")) + list(clean_dir.glob("*.epub")) + list(clean_dir.glob("*.txt"))
+    # Find clean files in one directory pass, grouped by type in the same
+    # order as globbing each type in turn (the order decides the seeds)
+    clean_by_extension = {".pdf": [], ".epub": [], ".txt": []}
+    with os.scandir(clean_dir) as entries:
+        for entry in entries:
+            dot = entry.name.rfind(".")
+            group = clean_by_extension.get(entry.name[dot:]) if dot >= 0 else None
+            if group is not None and entry.is_file():
+                group.append(clean_dir / entry.name)
+    clean_files = [clean_file for group in clean_by_extension.values() for clean_file in group]
     
     if not clean_files:
         print("No clean ebook files found")
@@ -321,20 +435,22 @@ def main():
     
     print(f"Found {len(clean_files)} clean files")
     
-    generator = NoiseGenerator(args.random_seed)
-    
     total_variations = 0
     
-    # Generate variations for each clean file
-    for clean_file in clean_files:
-        print(f"Processing {clean_file.name}...")
-        variations = generator.generate_variations(clean_file, output_dir, args.max_variations)
-        total_variations += len(variations)
-        
-        # Create duplicates if requested
-        if args.create_duplicates:
-            duplicates = generator.create_duplicate_files(clean_file, output_dir, 2)
-            total_variations += len(duplicates)
+    # Generate variations for each clean file, one task per file
+    tasks = [
+        (clean_file, output_dir, args.max_variations, args.random_seed + index,
+         args.link_mode, args.create_duplicates)
+        for index, clean_file in enumerate(clean_files)
+    ]
+    # Report progress about a hundred times per run, not once per file
+    report_every = max(1, len(clean_files) // 100)
+    with ProcessPoolExecutor() as executor:
+        results = zip(clean_files, executor.map(process_clean_file, tasks))
+        for index, (clean_file, count) in enumerate(results, 1):
+            total_variations += count
+            if index % report_every == 0 or index == len(clean_files):
+                print(f"[{index}/{len(clean_files)}] Processed {clean_file.name}")
     
     print(f"\n✓ Generated {total_variations} noisy files in {output_dir}")
     return 0
@@ -5,29 +5,99 @@ This script copies ebook files from the Downloads folder to the test fixtures di
 """
 
 import argparse
+import os
 import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Optional, Tuple
+
+# Per-file log lines are written out this many at a time
+LOG_BATCH = 1024
 
 
 def get_ebook_files(source_dir: Path) -> list[Path]:
-    """Find all ebook files in the source directory."""
+    """Find all ebook files in the source directory.
+    
+    Walks the tree with os.scandir, which gets file types from the directory
+    listing itself instead of stat-ing every entry. The order matches
+    source_dir.rglob('*'): each directory's files, then its subdirectories.
+    """
     extensions = {'.pdf', '.epub', '.txt', '.mobi', '.download', '.crdownload'}
     ebook_files = []
     
-    for file_path in source_dir.rglob('*'):
-        if file_path.is_file() and file_path.suffix.lower() in extensions:
-            ebook_files.append(file_path)
+    stack = [str(source_dir)]
+    while stack:
+        subdirs = []
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    # Don't descend into symlinked directories
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                        continue
+                    # Same rule as Path.suffix: a leading dot isn't a suffix
+                    name = entry.name
+                    dot = name.rfind('.')
+                    if (0 < dot < len(name) - 1 and name[dot:].lower() in extensions
+                            and entry.is_file()):
+                        ebook_files.append(Path(entry.path))
+        except PermissionError:
+            continue
+        stack.extend(reversed(subdirs))
     
     return ebook_files
 
 
-def copy_files_to_fixture(files: list[Path], output_dir: Path, preserve_structure: bool = False) -> None:
+def flush_log(lines: list[str]) -> None:
+    """Write buffered log lines in a single call and clear the buffer."""
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+        lines.clear()
+
+
+def copy_one(task: Tuple[Path, Path]) -> Optional[Exception]:
+    """Copy a single file with its metadata; returns the error, if any.
+    
+    An existing destination is left alone and reported as FileExistsError.
+    """
+    file_path, dest_path = task
+    try:
+        # Claim the name first; O_EXCL checks for an existing file as part
+        # of creating it
+        os.close(os.open(dest_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666))
+    except Exception as e:
+        return e
+    
+    try:
+        # Copy the file
+        shutil.copy2(file_path, dest_path)
+    except Exception as e:
+        # Don't leave an empty or partial fixture behind; the next run
+        # would skip it as existing
+        try:
+            os.unlink(dest_path)
+        except OSError:
+            pass
+        return e
+    return None
+
+
+def copy_files_to_fixture(files: list[Path], output_dir: Path, preserve_structure: bool = False,
+                          threads: int = 8) -> None:
     """Copy files to the fixtures directory."""
     output_dir.mkdir(parents=True, exist_ok=True)
     
     copied_count = 0
     skipped_count = 0
+    log = []
     
+    # Pick destinations up front, so files that flatten to the same name
+    # are skipped after the first, just as when copying one at a time
+    tasks = []
+    claimed = set()
+    created_dirs = {output_dir}
+    dir_errors = {}
     for file_path in files:
         if preserve_structure:
             # Preserve relative directory structure
@@ -37,26 +107,58 @@ def copy_files_to_fixture(files: list[Path], output_dir: Path, preserve_structur
             # Flatten structure, just use filename
             dest_path = output_dir / file_path.name
         
-        # Skip if file already exists
-        if dest_path.exists():
-            print(f"Skipping existing file: {dest_path.name}")
-            skipped_count += 1
-            continue
+        # Create parent directories if needed, once per directory; a
+        # failure fails every file that would go there
+        parent = dest_path.parent
+        if parent not in created_dirs and parent not in dir_errors:
+            try:
+                parent.mkdir(parents=True, exist_ok=True)
+                created_dirs.add(parent)
+            except OSError as e:
+                dir_errors[parent] = e
         
-        try:
-            # Create parent directories if needed
-            dest_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Copy the file
-            shutil.copy2(file_path, dest_path)
-            print(f"Copied: {file_path.name} -> {dest_path}")
-            copied_count += 1
-        except Exception as e:
-            print(f"Failed to copy {file_path.name}: {e}")
+        if parent in dir_errors:
+            error = dir_errors[parent]
+        elif dest_path in claimed:
+            error = FileExistsError()
+        else:
+            error = None
+        tasks.append((file_path, dest_path, error))
+        claimed.add(dest_path)
+    
+    # Copies happen in the kernel and release the GIL, so they run side
+    # by side on threads
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = executor.map(copy_one, [(file_path, dest_path)
+                                          for file_path, dest_path, error in tasks
+                                          if error is None])
+        for file_path, dest_path, error in tasks:
+            if error is None:
+                error = next(results)
+            if error is None:
+                log.append(f"Copied: {file_path.name} -> {dest_path}")
+                copied_count += 1
+            elif isinstance(error, FileExistsError):
+                # Skip if file already exists
+                log.append(f"Skipping existing file: {dest_path.name}")
+                skipped_count += 1
+            else:
+                log.append(f"Failed to copy {file_path.name}: {error}")
+            if len(log) >= LOG_BATCH:
+                flush_log(log)
     
+    flush_log(log)
     print(f"\nSummary: Copied {copied_count} files, skipped {skipped_count} existing files")
 
 
+def positive_int(value: str) -> int:
+    """argparse type for options that need a count of at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+
 def main():
     parser = argparse.ArgumentParser(description="Import ebook files from Downloads to test fixtures")
     parser.add_argument(
@@ -74,6 +176,12 @@ def main():
         action="store_true",
         help="Preserve directory structure from Downloads"
     )
+    parser.add_argument(
+        "--threads",
+        type=positive_int,
+        default=8,
+        help="Number of files to copy concurrently (default: 8)"
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -108,7 +216,7 @@ def main():
         return 0
     
     # Copy files
-    copy_files_to_fixture(ebook_files, output_dir, args.preserve_structure)
+    copy_files_to_fixture(ebook_files, output_dir, args.preserve_structure, args.threads)
     
     print(f"\n✓ Import completed. Test fixtures ready in: {output_dir}")
     return 0